@@ -156,7 +156,9 @@ def view(question_type, mistakes_only):
               help=f'每道错题生成的相似题数量（默认: {SIMILAR_QUESTIONS_COUNT}）')
 @click.option('--type', '-t', 'question_type', help='只生成指定题型的错题')
 @click.option('--limit', '-l', type=int, help='限制错题数量')
-def generate(output, format, answers, similar_count, question_type, limit):
+@click.option('--batch/--no-batch', 'use_batch', default=False,
+              help='使用 Message Batches API 生成相似题（费用减半，但可能要等待较长时间，默认: 不使用）')
+def generate(output, format, answers, similar_count, question_type, limit, use_batch):
     """生成错题练习卷（HTML或PDF格式）"""
     console.print("\n[bold cyan]开始生成错题练习卷...[/bold cyan]\n")
 
@@ -195,7 +197,8 @@ def generate(output, format, answers, similar_count, question_type, limit):
         practice_set = generator.generate_practice_set(
             mistakes,
             include_original=True,
-            similar_count=similar_count
+            similar_count=similar_count,
+            use_batch=use_batch
         )
 
         # 3. 生成文档
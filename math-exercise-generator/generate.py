@@ -7,6 +7,7 @@ import sys
 import io
 import click
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
 
 # 设置 stdout 编码
@@ -19,7 +20,30 @@ from math_generator.question_types import (
     FillBlankGenerator,
     ListVerticalGenerator
 )
-from math_generator.pdf import PDFBuilder
+from math_generator.pdf import get_builder
+
+
+# 难度预设（模块加载时构建一次，只读）
+_PRESETS = MappingProxyType({
+    'easy': MappingProxyType({
+        'add': ('1x1', '2x1', '2x2'),
+        'sub': ('2x1', '2x2'),
+        'mul': ('1x1', '2x1'),
+        'div': ('2x1',)
+    }),
+    'medium': MappingProxyType({
+        'add': ('2x2', '3x2', '3x3'),
+        'sub': ('2x2', '3x2', '3x3'),
+        'mul': ('2x1', '2x2', '3x1'),
+        'div': ('2x1', '3x1')
+    }),
+    'hard': MappingProxyType({
+        'add': ('3x3', '4x3', '4x4'),
+        'sub': ('3x3', '4x3', '4x4'),
+        'mul': ('2x2', '3x2', '4x1'),
+        'div': ('3x1', '4x1', '4x2')
+    })
+})
 
 
 @click.command()
@@ -174,7 +198,7 @@ def _generate_single_pdf(output, count, difficulty, add_digits, sub_digits, mul_
     click.echo(f"生成PDF...")
 
     # 构建 PDF
-    builder = PDFBuilder()
+    builder = get_builder()
     builder.build(
         output_path=output_path,
         title=title,
@@ -195,27 +219,7 @@ def _parse_digit_configs(difficulty, add_digits, sub_digits, mul_digits, div_dig
 
     # 如果指定了难度预设
     if difficulty:
-        presets = {
-            'easy': {
-                'add': ['1x1', '2x1', '2x2'],
-                'sub': ['2x1', '2x2'],
-                'mul': ['1x1', '2x1'],
-                'div': ['2x1']
-            },
-            'medium': {
-                'add': ['2x2', '3x2', '3x3'],
-                'sub': ['2x2', '3x2', '3x3'],
-                'mul': ['2x1', '2x2', '3x1'],
-                'div': ['2x1', '3x1']
-            },
-            'hard': {
-                'add': ['3x3', '4x3', '4x4'],
-                'sub': ['3x3', '4x3', '4x4'],
-                'mul': ['2x2', '3x2', '4x1'],
-                'div': ['3x1', '4x1', '4x2']
-            }
-        }
-        return presets[difficulty]
+        return _PRESETS[difficulty]
 
     # 自定义配置
     config = {}
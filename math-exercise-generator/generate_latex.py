@@ -7,6 +7,7 @@ import sys
 import io
 import click
 from pathlib import Path
+from types import MappingProxyType
 from datetime import datetime
 
 # 设置编码
@@ -22,6 +23,29 @@ from math_generator.question_types import (
 from math_generator.latex_generator import LaTeXGenerator
 
 
+# 难度预设（模块加载时构建一次，只读）
+_PRESETS = MappingProxyType({
+    'easy': MappingProxyType({
+        'add': ('2x2', '2x1'),
+        'sub': ('2x2', '2x1'),
+        'mul': ('2x1', '1x1'),
+        'div': ('2x1',)
+    }),
+    'medium': MappingProxyType({
+        'add': ('3x3', '3x2'),
+        'sub': ('3x3', '3x2'),
+        'mul': ('2x2', '3x1'),
+        'div': ('3x1', '2x1')
+    }),
+    'hard': MappingProxyType({
+        'add': ('4x4', '4x3'),
+        'sub': ('4x4', '4x3'),
+        'mul': ('3x2', '4x1'),
+        'div': ('4x2', '4x1')
+    })
+})
+
+
 @click.command()
 @click.option('--output', '-o', type=click.Path(), help='输出PDF文件路径')
 @click.option('--count', type=int, default=30, help='总题目数量 [默认: 30]')
@@ -105,27 +129,7 @@ def main(output, count, difficulty, add_digits, sub_digits, mul_digits, div_digi
 def _parse_digit_configs(difficulty, add_digits, sub_digits, mul_digits, div_digits):
     """解析位数配置"""
     if difficulty:
-        presets = {
-            'easy': {
-                'add': ['2x2', '2x1'],
-                'sub': ['2x2', '2x1'],
-                'mul': ['2x1', '1x1'],
-                'div': ['2x1']
-            },
-            'medium': {
-                'add': ['3x3', '3x2'],
-                'sub': ['3x3', '3x2'],
-                'mul': ['2x2', '3x1'],
-                'div': ['3x1', '2x1']
-            },
-            'hard': {
-                'add': ['4x4', '4x3'],
-                'sub': ['4x4', '4x3'],
-                'mul': ['3x2', '4x1'],
-                'div': ['4x2', '4x1']
-            }
-        }
-        return presets[difficulty]
+        return _PRESETS[difficulty]
 
     config = {}
     config['add'] = add_digits.split(',') if add_digits else ['3x3', '3x2']
@@ -2,6 +2,7 @@
 LaTeX 生成器
 使用 Jinja2 模板生成 LaTeX 代码，然后编译成 PDF
 """
+import os
 import subprocess
 from pathlib import Path
 from typing import List, Dict, Any
@@ -152,11 +153,11 @@ class LaTeXGenerator:
             if result.returncode != 0:
                 raise RuntimeError(f"LaTeX 编译失败:\n{result.stdout}\n{result.stderr}")
 
-        # 移动生成的 PDF 到目标位置
+        # 移动生成的 PDF 到目标位置（os.replace 会直接覆盖已存在的目标文件）
         generated_pdf = tex_path.with_suffix('.pdf')
         if generated_pdf.exists():
             if generated_pdf != output_path:
-                generated_pdf.rename(output_path)
+                os.replace(str(generated_pdf), str(output_path))
 
         # 清理临时文件
         self._cleanup_temp_files(tex_path)
@@ -3,7 +3,7 @@
 支持1-4位数的灵活生成
 """
 import random
-from typing import Optional
+from typing import List, Optional, Tuple
 
 
 class NumberGenerator:
@@ -26,14 +26,7 @@ class NumberGenerator:
         Returns:
             生成的数字
         """
-        if digits < 1 or digits > 4:
-            raise ValueError("位数必须在1-4之间")
-
-        # 确定范围
-        if min_val is None:
-            min_val = 10 ** (digits - 1) if digits > 1 else 1
-        if max_val is None:
-            max_val = 10 ** digits - 1
+        min_val, max_val = NumberGenerator.get_range(digits, min_val, max_val)
 
         # 生成随机数
         num = random.randint(min_val, max_val)
@@ -47,6 +40,53 @@ class NumberGenerator:
 
         return num
 
+    @staticmethod
+    def generate_many(digits: int,
+                      count: int,
+                      min_val: Optional[int] = None,
+                      max_val: Optional[int] = None) -> List[int]:
+        """
+        批量生成指定位数的数字
+
+        用 random.choices 在取值范围上一次性抽取，比逐个调用 random.randint 快得多。
+
+        Args:
+            digits: 位数 (1-4)
+            count: 生成数量
+            min_val: 最小值
+            max_val: 最大值
+
+        Returns:
+            生成的数字列表
+        """
+        min_val, max_val = NumberGenerator.get_range(digits, min_val, max_val)
+        return random.choices(range(min_val, max_val + 1), k=count)
+
+    @staticmethod
+    def get_range(digits: int,
+                  min_val: Optional[int] = None,
+                  max_val: Optional[int] = None) -> Tuple[int, int]:
+        """
+        计算指定位数的取值范围
+
+        Args:
+            digits: 位数 (1-4)
+            min_val: 最小值
+            max_val: 最大值
+
+        Returns:
+            (min_val, max_val) 元组
+        """
+        if digits < 1 or digits > 4:
+            raise ValueError("位数必须在1-4之间")
+
+        if min_val is None:
+            min_val = 10 ** (digits - 1) if digits > 1 else 1
+        if max_val is None:
+            max_val = 10 ** digits - 1
+
+        return min_val, max_val
+
     @staticmethod
     def generate_with_constraint(digits: int,
                                  avoid_zero: bool = True,
@@ -2,7 +2,7 @@
 加法生成器
 """
 import random
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from ..number_gen import NumberGenerator
 
 
@@ -33,15 +33,21 @@ class AdditionGenerator:
         if force_carry and no_carry:
             raise ValueError("force_carry 和 no_carry 不能同时为 True")
 
+        # 取值范围在循环外计算一次，循环内直接抽取随机数
+        a_lo, a_hi = NumberGenerator.get_range(a_digits, min_val, max_val)
+        b_lo, b_hi = NumberGenerator.get_range(b_digits, min_val, max_val)
+        randint = random.randint
+        check_carry = AdditionGenerator._check_carry
+
         max_attempts = 100
         for _ in range(max_attempts):
-            a = NumberGenerator.generate(a_digits, min_val, max_val)
-            b = NumberGenerator.generate(b_digits, min_val, max_val)
+            a = randint(a_lo, a_hi)
+            b = randint(b_lo, b_hi)
 
             result = a + b
 
             # 检查是否需要进位
-            has_carry = AdditionGenerator._check_carry(a, b)
+            has_carry = check_carry(a, b)
 
             if force_carry and not has_carry:
                 continue
@@ -55,6 +61,68 @@ class AdditionGenerator:
         b = NumberGenerator.generate(b_digits, min_val, max_val)
         return a, b, a + b
 
+    @staticmethod
+    def generate_many(count: int,
+                      a_digits: int,
+                      b_digits: int,
+                      force_carry: bool = False,
+                      no_carry: bool = False,
+                      min_val: Optional[int] = None,
+                      max_val: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        批量生成加法题
+
+        每轮一次性抽取所有缺额的候选数字，只对不满足条件的部分重新抽取。
+
+        Args:
+            count: 生成数量
+            a_digits: 第一个加数的位数 (1-4)
+            b_digits: 第二个加数的位数 (1-4)
+            force_carry: 强制进位
+            no_carry: 禁止进位
+            min_val: 最小值
+            max_val: 最大值
+
+        Returns:
+            (a, b, result) 元组列表
+        """
+        if force_carry and no_carry:
+            raise ValueError("force_carry 和 no_carry 不能同时为 True")
+
+        a_lo, a_hi = NumberGenerator.get_range(a_digits, min_val, max_val)
+        b_lo, b_hi = NumberGenerator.get_range(b_digits, min_val, max_val)
+        choices = random.choices
+        check_carry = AdditionGenerator._check_carry
+
+        results = []
+        max_attempts = 100
+        for _ in range(max_attempts):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+
+            candidates = zip(
+                choices(range(a_lo, a_hi + 1), k=remaining),
+                choices(range(b_lo, b_hi + 1), k=remaining)
+            )
+            for a, b in candidates:
+                if force_carry or no_carry:
+                    has_carry = check_carry(a, b)
+                    if force_carry and not has_carry:
+                        continue
+                    if no_carry and has_carry:
+                        continue
+
+                results.append((a, b, a + b))
+
+        # 仍有缺额时逐个生成（沿用单题生成的放宽逻辑）
+        for _ in range(count - len(results)):
+            results.append(AdditionGenerator.generate(
+                a_digits, b_digits, force_carry, no_carry, min_val, max_val
+            ))
+
+        return results
+
     @staticmethod
     def _check_carry(a: int, b: int) -> bool:
         """
@@ -67,19 +135,12 @@ class AdditionGenerator:
         Returns:
             是否需要进位
         """
-        a_str = str(a)
-        b_str = str(b)
-
-        # 对齐到相同长度
-        max_len = max(len(a_str), len(b_str))
-        a_str = a_str.zfill(max_len)
-        b_str = b_str.zfill(max_len)
-
-        # 从右往左检查每一位
-        for i in range(max_len - 1, -1, -1):
-            digit_sum = int(a_str[i]) + int(b_str[i])
-            if digit_sum >= 10:
+        # 从个位开始逐位相加，某一位的和达到 10 即需要进位
+        while a and b:
+            if a % 10 + b % 10 >= 10:
                 return True
+            a //= 10
+            b //= 10
 
         return False
 
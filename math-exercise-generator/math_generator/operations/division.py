@@ -2,7 +2,7 @@
 除法生成器
 """
 import random
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from ..number_gen import NumberGenerator
 
 
@@ -87,6 +87,51 @@ class DivisionGenerator:
 
         return dividend, divisor, quotient, remainder
 
+    @staticmethod
+    def generate_many(count: int,
+                      dividend_digits: int,
+                      divisor_digits: int) -> List[Tuple[int, int, int, int]]:
+        """
+        批量生成除法题（允许余数）
+
+        每轮一次性抽取所有缺额的被除数和除数，只对除数不小于被除数的部分重新抽取。
+
+        Args:
+            count: 生成数量
+            dividend_digits: 被除数的位数 (1-4)
+            divisor_digits: 除数的位数 (1-3)
+
+        Returns:
+            (dividend, divisor, quotient, remainder) 元组列表
+        """
+        if divisor_digits > 3:
+            raise ValueError("除数最多3位")
+
+        results = []
+        max_attempts = 100
+        for _ in range(max_attempts):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+
+            candidates = zip(
+                NumberGenerator.generate_many(dividend_digits, remaining),
+                NumberGenerator.generate_many(divisor_digits, remaining, min_val=2)
+            )
+            for dividend, divisor in candidates:
+                # 确保除数小于被除数
+                if divisor >= dividend:
+                    continue
+
+                quotient, remainder = divmod(dividend, divisor)
+                results.append((dividend, divisor, quotient, remainder))
+
+        # 仍有缺额时逐个生成（沿用单题生成的兜底逻辑）
+        for _ in range(count - len(results)):
+            results.append(DivisionGenerator.generate(dividend_digits, divisor_digits))
+
+        return results
+
     @staticmethod
     def generate_exact_division(dividend_digits: int,
                                 divisor_digits: int) -> Tuple[int, int, int, int]:
@@ -2,7 +2,7 @@
 乘法生成器
 """
 import random
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from ..number_gen import NumberGenerator
 
 
@@ -30,10 +30,15 @@ class MultiplicationGenerator:
         Returns:
             (multiplicand, multiplier, result) 元组
         """
+        # 取值范围在循环外计算一次，循环内直接抽取随机数
+        a_lo, a_hi = NumberGenerator.get_range(a_digits, min_val, max_val)
+        b_lo, b_hi = NumberGenerator.get_range(b_digits, min_val, max_val)
+        randint = random.randint
+
         max_attempts = 100
         for _ in range(max_attempts):
-            multiplicand = NumberGenerator.generate(a_digits, min_val, max_val)
-            multiplier = NumberGenerator.generate(b_digits, min_val, max_val)
+            multiplicand = randint(a_lo, a_hi)
+            multiplier = randint(b_lo, b_hi)
 
             result = multiplicand * multiplier
 
@@ -62,6 +67,51 @@ class MultiplicationGenerator:
 
         return multiplicand, multiplier, result
 
+    @staticmethod
+    def generate_many(count: int,
+                      a_digits: int,
+                      b_digits: int,
+                      max_result: int = 9999) -> List[Tuple[int, int, int]]:
+        """
+        批量生成乘法题
+
+        每轮一次性抽取所有缺额的候选数字，只对结果超限的部分重新抽取。
+
+        Args:
+            count: 生成数量
+            a_digits: 被乘数的位数 (1-4)
+            b_digits: 乘数的位数 (1-4)
+            max_result: 结果的最大值（默认9999，即4位数）
+
+        Returns:
+            (multiplicand, multiplier, result) 元组列表
+        """
+        results = []
+        max_attempts = 100
+        for _ in range(max_attempts):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+
+            candidates = zip(
+                NumberGenerator.generate_many(a_digits, remaining),
+                NumberGenerator.generate_many(b_digits, remaining)
+            )
+            for multiplicand, multiplier in candidates:
+                result = multiplicand * multiplier
+
+                # 检查结果是否超过最大值
+                if result > max_result:
+                    continue
+
+                results.append((multiplicand, multiplier, result))
+
+        # 仍有缺额时逐个生成（沿用单题生成的放宽逻辑）
+        for _ in range(count - len(results)):
+            results.append(MultiplicationGenerator.generate(a_digits, b_digits, max_result))
+
+        return results
+
     @staticmethod
     def generate_table(a_digit: int, b_digit: int) -> Tuple[int, int, int]:
         """
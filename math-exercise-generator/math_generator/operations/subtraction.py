@@ -2,7 +2,7 @@
 减法生成器
 """
 import random
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 from ..number_gen import NumberGenerator
 
 
@@ -33,10 +33,18 @@ class SubtractionGenerator:
         if force_borrow and no_borrow:
             raise ValueError("force_borrow 和 no_borrow 不能同时为 True")
 
+        # 取值范围在循环外计算一次，循环内直接抽取随机数
+        a_lo, a_hi = NumberGenerator.get_range(a_digits, min_val, max_val)
+        b_lo, b_hi = NumberGenerator.get_range(b_digits, min_val, max_val)
+        randint = random.randint
+        check_borrow = SubtractionGenerator._check_borrow
+
         max_attempts = 100
         for _ in range(max_attempts):
-            minuend = NumberGenerator.generate(a_digits, min_val, max_val)
-            subtrahend = NumberGenerator.generate(b_digits, min_val, max_val)
+            minuend = randint(a_lo, a_hi)
+            subtrahend = randint(b_lo, b_hi)
+            if force_borrow:
+                subtrahend = SubtractionGenerator._bias_borrow(minuend, subtrahend, b_lo, b_hi)
 
             # 确保被减数 > 减数（结果为正数）
             if minuend <= subtrahend:
@@ -45,7 +53,7 @@ class SubtractionGenerator:
             result = minuend - subtrahend
 
             # 检查是否需要退位
-            has_borrow = SubtractionGenerator._check_borrow(minuend, subtrahend)
+            has_borrow = check_borrow(minuend, subtrahend)
 
             if force_borrow and not has_borrow:
                 continue
@@ -64,6 +72,103 @@ class SubtractionGenerator:
 
         return minuend, subtrahend, minuend - subtrahend
 
+    @staticmethod
+    def generate_many(count: int,
+                      a_digits: int,
+                      b_digits: int,
+                      force_borrow: bool = False,
+                      no_borrow: bool = False,
+                      min_val: Optional[int] = None,
+                      max_val: Optional[int] = None) -> List[Tuple[int, int, int]]:
+        """
+        批量生成减法题
+
+        每轮一次性抽取所有缺额的候选数字，只对不满足条件的部分重新抽取。
+
+        Args:
+            count: 生成数量
+            a_digits: 被减数的位数 (1-4)
+            b_digits: 减数的位数 (1-4)
+            force_borrow: 强制退位
+            no_borrow: 禁止退位
+            min_val: 最小值
+            max_val: 最大值
+
+        Returns:
+            (minuend, subtrahend, result) 元组列表
+        """
+        if force_borrow and no_borrow:
+            raise ValueError("force_borrow 和 no_borrow 不能同时为 True")
+
+        a_lo, a_hi = NumberGenerator.get_range(a_digits, min_val, max_val)
+        b_lo, b_hi = NumberGenerator.get_range(b_digits, min_val, max_val)
+        choices = random.choices
+        check_borrow = SubtractionGenerator._check_borrow
+
+        results = []
+        max_attempts = 100
+        for _ in range(max_attempts):
+            remaining = count - len(results)
+            if remaining <= 0:
+                break
+
+            candidates = zip(
+                choices(range(a_lo, a_hi + 1), k=remaining),
+                choices(range(b_lo, b_hi + 1), k=remaining)
+            )
+            if force_borrow:
+                candidates = [
+                    (minuend, SubtractionGenerator._bias_borrow(minuend, subtrahend, b_lo, b_hi))
+                    for minuend, subtrahend in candidates
+                ]
+            for minuend, subtrahend in candidates:
+                # 确保被减数 > 减数（结果为正数）
+                if minuend <= subtrahend:
+                    continue
+
+                if force_borrow or no_borrow:
+                    has_borrow = check_borrow(minuend, subtrahend)
+                    if force_borrow and not has_borrow:
+                        continue
+                    if no_borrow and has_borrow:
+                        continue
+
+                results.append((minuend, subtrahend, minuend - subtrahend))
+
+        # 仍有缺额时逐个生成（沿用单题生成的放宽逻辑）
+        for _ in range(count - len(results)):
+            results.append(SubtractionGenerator.generate(
+                a_digits, b_digits, force_borrow, no_borrow, min_val, max_val
+            ))
+
+        return results
+
+    @staticmethod
+    def _bias_borrow(minuend: int, subtrahend: int, b_lo: int, b_hi: int) -> int:
+        """
+        调整减数的个位，使个位必然退位（用于 force_borrow，减少拒绝重抽）
+
+        被减数个位为 9 或调整后超出减数范围时保持原值，交给退位检查处理。
+
+        Args:
+            minuend: 被减数
+            subtrahend: 减数
+            b_lo: 减数最小值
+            b_hi: 减数最大值
+
+        Returns:
+            调整后的减数
+        """
+        m_ones = minuend % 10
+        s_ones = subtrahend % 10
+        if s_ones > m_ones or m_ones == 9:
+            return subtrahend
+
+        biased = subtrahend - s_ones + random.randint(m_ones + 1, 9)
+        if b_lo <= biased <= b_hi:
+            return biased
+        return subtrahend
+
     @staticmethod
     def _check_borrow(minuend: int, subtrahend: int) -> bool:
         """
@@ -76,18 +181,12 @@ class SubtractionGenerator:
         Returns:
             是否需要退位
         """
-        minuend_str = str(minuend)
-        subtrahend_str = str(subtrahend)
-
-        # 对齐到相同长度
-        max_len = max(len(minuend_str), len(subtrahend_str))
-        minuend_str = minuend_str.zfill(max_len)
-        subtrahend_str = subtrahend_str.zfill(max_len)
-
-        # 从右往左检查每一位
-        for i in range(max_len - 1, -1, -1):
-            if int(minuend_str[i]) < int(subtrahend_str[i]):
+        # 从个位开始逐位比较，减数的某一位大于被减数的对应位即需要退位
+        while subtrahend:
+            if minuend % 10 < subtrahend % 10:
                 return True
+            minuend //= 10
+            subtrahend //= 10
 
         return False
 
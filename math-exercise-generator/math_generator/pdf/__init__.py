@@ -3,4 +3,14 @@ PDF 生成模块
 """
 from .builder import PDFBuilder
 
-__all__ = ['PDFBuilder']
+__all__ = ['PDFBuilder', 'get_builder']
+
+_DEFAULT_BUILDER = None
+
+
+def get_builder() -> PDFBuilder:
+    """获取共享的 PDF 构建器（首次调用时创建，批量生成时避免重复初始化）"""
+    global _DEFAULT_BUILDER
+    if _DEFAULT_BUILDER is None:
+        _DEFAULT_BUILDER = PDFBuilder()
+    return _DEFAULT_BUILDER
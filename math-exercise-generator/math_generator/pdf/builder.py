@@ -11,8 +11,21 @@ from reportlab.lib import colors
 from .fonts import FontManager
 
 
+# 常用颜色（模块加载时创建一次，状态缓存按对象身份比较）
+_TITLE_BLUE = colors.HexColor('#1e88e5')
+_SECTION_BG = colors.HexColor('#e3f2fd')
+_SECTION_BLUE = colors.HexColor('#1565c0')
+_ANSWER_GREEN = colors.HexColor('#43a047')
+_ANSWER_DARK_GREEN = colors.HexColor('#2e7d32')
+
+
 class PDFBuilder:
-    """PDF 构建器"""
+    """
+    PDF 构建器
+
+    构建器可以重复使用：build() 每次都新建画布并重置状态缓存，
+    批量生成多份 PDF 时只需创建一个实例（不支持多线程并发调用）。
+    """
 
     def __init__(self):
         """初始化 PDF 构建器"""
@@ -33,6 +46,15 @@ class PDFBuilder:
         self.content_width = self.page_width - self.margin_left - self.margin_right
         self.content_height = self.page_height - self.margin_top - self.margin_bottom
 
+        # 常用绘制坐标（预先计算，避免每次绘制时重复运算）
+        self._center_x = self.page_width / 2
+        self._right_edge = self.page_width - self.margin_right
+        self._sec_x = self.margin_left - 5
+        self._sec_w = self.content_width + 10
+
+        # 画布状态缓存（避免重复写入相同的字体/颜色/线宽指令）
+        self._reset_canvas_state()
+
     def build(self,
              output_path: Path,
              title: str,
@@ -60,6 +82,7 @@ class PDFBuilder:
 
         # 创建 PDF 画布
         c = canvas.Canvas(str(output_path), pagesize=A4)
+        self._reset_canvas_state()
 
         # 生成题目页
         self._draw_question_page(
@@ -74,6 +97,7 @@ class PDFBuilder:
         # 生成答案页
         if include_answers:
             c.showPage()  # 新页面
+            self._reset_canvas_state()  # 换页后 reportlab 会重置图形状态
             self._draw_answer_page(
                 c,
                 oral_questions,
@@ -86,6 +110,91 @@ class PDFBuilder:
         # 保存 PDF
         c.save()
 
+    def _reset_canvas_state(self) -> None:
+        """清空画布状态缓存（新建画布或换页后调用）"""
+        self._cur_font = None
+        self._cur_fill = None
+        self._cur_stroke = None
+        self._cur_line_width = None
+
+    def _set_font(self, c: canvas.Canvas, size: float) -> None:
+        """设置字体，与当前状态相同时跳过"""
+        if size != self._cur_font:
+            c.setFont(self.font_name, size)
+            self._cur_font = size
+
+    def _set_fill_color(self, c: canvas.Canvas, color) -> None:
+        """设置填充色，与当前状态相同时跳过"""
+        if color is not self._cur_fill:
+            c.setFillColor(color)
+            self._cur_fill = color
+
+    def _set_stroke_color(self, c: canvas.Canvas, color) -> None:
+        """设置描边色，与当前状态相同时跳过"""
+        if color is not self._cur_stroke:
+            c.setStrokeColor(color)
+            self._cur_stroke = color
+
+    def _set_line_width(self, c: canvas.Canvas, width: float) -> None:
+        """设置线宽，与当前状态相同时跳过"""
+        if width != self._cur_line_width:
+            c.setLineWidth(width)
+            self._cur_line_width = width
+
+    def _ensure_space(self, c: canvas.Canvas, y: float, needed: float) -> float:
+        """
+        确保当前页剩余空间足够，不足时换页
+
+        Args:
+            c: 画布
+            y: 当前纵坐标
+            needed: 需要的高度
+
+        Returns:
+            可用的纵坐标（换页后为新页顶部）
+        """
+        if y - needed >= self.margin_bottom:
+            return y
+
+        c.showPage()
+        self._reset_canvas_state()  # 换页后 reportlab 会重置图形状态
+        return self.page_height - self.margin_top
+
+    def _ensure_text_space(self,
+                           c: canvas.Canvas,
+                           text,
+                           y: float,
+                           needed: float,
+                           size: float):
+        """
+        确保剩余空间足够，并返回当前页可继续追加内容的文本对象
+
+        同一页内的多行文本合并到一个 TextObject 中（只输出一个 BT…ET 块），
+        换页前先把已累积的文本写入画布，换页后重新创建。
+
+        Args:
+            c: 画布
+            text: 当前文本对象（尚未创建时为 None）
+            y: 当前纵坐标
+            needed: 需要的高度
+            size: 字号
+
+        Returns:
+            (可用的纵坐标, 文本对象)
+        """
+        if text is not None and y - needed < self.margin_bottom:
+            c.drawText(text)
+            text = None
+
+        y = self._ensure_space(c, y, needed)
+
+        if text is None:
+            # 文本对象沿用画布当前字体，因此先设置字体再创建
+            self._set_font(c, size)
+            text = c.beginText()
+
+        return y, text
+
     def _draw_question_page(self,
                            c: canvas.Canvas,
                            title: str,
@@ -122,15 +231,15 @@ class PDFBuilder:
     def _draw_header(self, c: canvas.Canvas, title: str, y: float) -> float:
         """绘制页眉"""
         # 标题（蓝色）
-        c.setFillColor(colors.HexColor('#1e88e5'))
-        c.setFont(self.font_name, 18)
-        c.drawCentredString(self.page_width / 2, y, title)
+        self._set_fill_color(c, _TITLE_BLUE)
+        self._set_font(c, 18)
+        c.drawCentredString(self._center_x, y, title)
 
         y -= 30
 
         # 信息栏（黑色）
-        c.setFillColor(colors.black)
-        c.setFont(self.font_name, 10)
+        self._set_fill_color(c, colors.black)
+        self._set_font(c, 10)
         date_str = datetime.now().strftime('%Y年%m月%d日')
         info_text = f"姓名:__________  班级:__________  日期:{date_str}  成绩:__________"
         c.drawString(self.margin_left, y, info_text)
@@ -138,109 +247,110 @@ class PDFBuilder:
         y -= 20
 
         # 分隔线（蓝色）
-        c.setStrokeColor(colors.HexColor('#1e88e5'))
-        c.setLineWidth(2)
-        c.line(self.margin_left, y, self.page_width - self.margin_right, y)
-        c.setStrokeColor(colors.black)
-        c.setLineWidth(1)
+        self._set_stroke_color(c, _TITLE_BLUE)
+        self._set_line_width(c, 2)
+        c.line(self.margin_left, y, self._right_edge, y)
+        self._set_stroke_color(c, colors.black)
+        self._set_line_width(c, 1)
 
         return y - 15
 
     def _draw_section_title(self, c: canvas.Canvas, title: str, count: int, points: int, y: float) -> float:
         """绘制章节标题"""
+        # 标题下方至少留出一行题目的空间，避免标题单独落在页底
+        y = self._ensure_space(c, y, 60)
+
         # 章节标题（深蓝色背景）
-        c.setFillColor(colors.HexColor('#e3f2fd'))
-        c.rect(self.margin_left - 5, y - 5, self.content_width + 10, 20, fill=1, stroke=0)
+        self._set_fill_color(c, _SECTION_BG)
+        c.rect(self._sec_x, y - 5, self._sec_w, 20, fill=1, stroke=0)
 
         # 标题文字（深蓝色）
-        c.setFillColor(colors.HexColor('#1565c0'))
-        c.setFont(self.font_name, 12)
+        self._set_fill_color(c, _SECTION_BLUE)
+        self._set_font(c, 12)
         total_points = count * points
         section_text = f"{title}（每题{points}分，共{total_points}分）"
         c.drawString(self.margin_left, y, section_text)
 
         # 恢复黑色
-        c.setFillColor(colors.black)
+        self._set_fill_color(c, colors.black)
 
         return y - 25
 
     def _draw_oral_questions(self, c: canvas.Canvas, questions: List, y: float) -> float:
         """绘制口算题（横式排列）"""
-        c.setFont(self.font_name, 12)
-
         # 每行2道题
         col_width = self.content_width / 2
         row_height = 35  # 增加行间距
+        text = None
 
         for i, q in enumerate(questions):
-            row = i // 2
             col = i % 2
 
+            # 每行开始前检查剩余空间
+            if col == 0:
+                y, text = self._ensure_text_space(c, text, y, row_height, 12)
+
             x = self.margin_left + col * col_width
-            current_y = y - row * row_height
 
             # 题号和题目
-            text = f"{i + 1}. {q.question}"
-            c.drawString(x, current_y, text)
+            text.setTextOrigin(x, y)
+            text.textOut(f"{i + 1}. {q.question}")
+
+            if col == 1 or i == len(questions) - 1:
+                y -= row_height
 
-        # 计算需要的总高度
-        total_rows = (len(questions) + 1) // 2
-        return y - total_rows * row_height - 15
+        if text is not None:
+            c.drawText(text)
+
+        return y - 15
 
     def _draw_vertical_questions(self, c: canvas.Canvas, questions: List, y: float) -> float:
         """绘制竖式计算题"""
-        c.setFont(self.font_name, 11)
-
         # 每行2道题
         col_width = self.content_width / 2
         question_height = 90  # 每道竖式题的高度（增加间距）
 
+        # 边框尺寸（参考教材格式）
+        box_width = 150
+        box_height = 80
+
         for i, q in enumerate(questions):
-            row = i // 2
             col = i % 2
 
+            # 每行开始前检查剩余空间（边框底部在题号下方65处）
+            if col == 0:
+                y = self._ensure_space(c, y, 65)
+
             x = self.margin_left + col * col_width + 30
-            current_y = y - row * question_height
 
-            # 绘制边框（参考教材格式）
-            box_width = 150
-            box_height = 80
-            c.setLineWidth(1)
-            c.rect(x - 30, current_y - 65, box_width, box_height, stroke=1, fill=0)
+            # 绘制边框
+            self._set_line_width(c, 1)
+            c.rect(x - 30, y - 65, box_width, box_height, stroke=1, fill=0)
 
             # 绘制题号（在边框内左上角）
-            c.setFont(self.font_name, 10)
-            c.drawString(x - 25, current_y, f"{i + 1}")
+            self._set_font(c, 10)
+            c.drawString(x - 25, y, f"{i + 1}")
 
             # 绘制竖式
-            self._draw_vertical_format(c, q, x, current_y - 10)
+            self._draw_vertical_format(c, q, x, y - 10)
+
+            if col == 1 or i == len(questions) - 1:
+                y -= question_height
 
-        # 计算总高度
-        total_rows = (len(questions) + 1) // 2
-        return y - total_rows * question_height - 10
+        return y - 10
 
     def _draw_vertical_format(self, c: canvas.Canvas, question, x: float, y: float) -> None:
         """绘制竖式格式"""
         op = question.operation
 
         if op in ['add', 'sub']:
-            a, b = question.numbers[:2]
             symbol = '+' if op == 'add' else '-'
 
-            # 将数字转换为带空格的格式（参考教材）
-            a_str = str(a)
-            b_str = str(b)
-
-            # 对齐到相同长度
-            max_len = max(len(a_str), len(b_str))
-            a_str = a_str.zfill(max_len)
-            b_str = b_str.zfill(max_len)
+            # 带空格、已对齐的数字（参考教材，创建题目时已预先计算）
+            a_spaced = question.a_spaced
+            b_spaced = question.b_spaced
 
-            # 添加空格分隔每个数字
-            a_spaced = ' '.join(list(a_str))
-            b_spaced = ' '.join(list(b_str))
-
-            c.setFont(self.font_name, 14)  # 较大字体
+            self._set_font(c, 14)  # 较大字体
 
             # 计算宽度
             char_width = 10  # 每个字符（包括空格）的宽度
@@ -254,31 +364,20 @@ class PDFBuilder:
             c.drawRightString(x + total_width, y - 24, b_spaced)
 
             # 横线
-            c.setLineWidth(1.5)
+            self._set_line_width(c, 1.5)
             c.line(x - 25, y - 30, x + total_width + 5, y - 30)
-            c.setLineWidth(1)
+            self._set_line_width(c, 1)
 
             # 答案框
-            c.setFont(self.font_name, 11)
+            self._set_font(c, 11)
             c.drawString(x + 10, y - 48, "(          )")
 
         elif op == 'mul':
-            a, b = question.numbers[:2]
-
-            # 将数字转换为带空格的格式
-            a_str = str(a)
-            b_str = str(b)
-
-            # 对齐到相同长度
-            max_len = max(len(a_str), len(b_str))
-            a_str = a_str.zfill(max_len)
-            b_str = b_str.zfill(max_len)
+            # 带空格、已对齐的数字
+            a_spaced = question.a_spaced
+            b_spaced = question.b_spaced
 
-            # 添加空格
-            a_spaced = ' '.join(list(a_str))
-            b_spaced = ' '.join(list(b_str))
-
-            c.setFont(self.font_name, 14)
+            self._set_font(c, 14)
 
             # 计算宽度
             char_width = 10
@@ -292,22 +391,21 @@ class PDFBuilder:
             c.drawRightString(x + total_width, y - 24, b_spaced)
 
             # 横线
-            c.setLineWidth(1.5)
+            self._set_line_width(c, 1.5)
             c.line(x - 25, y - 30, x + total_width + 5, y - 30)
-            c.setLineWidth(1)
+            self._set_line_width(c, 1)
 
             # 答案框
-            c.setFont(self.font_name, 11)
+            self._set_font(c, 11)
             c.drawString(x + 10, y - 48, "(          )")
 
         elif op == 'div':
-            dividend, divisor = question.numbers[:2]
+            divisor = question.numbers[1]
 
             # 除法竖式（严格按照教材标准）
             divisor_str = str(divisor)
-            dividend_str = str(dividend)
 
-            c.setFont(self.font_name, 14)
+            self._set_font(c, 14)
 
             # 除数（左边）
             divisor_x = x - 10
@@ -318,7 +416,7 @@ class PDFBuilder:
             vertical_line_x = divisor_x + divisor_width + 5
 
             # 被除数（每个数字之间加空格）
-            dividend_with_spaces = ' '.join(list(dividend_str))
+            dividend_with_spaces = question.a_spaced
             dividend_x = vertical_line_x + 5
             c.drawString(dividend_x, y - 2, dividend_with_spaces)
 
@@ -327,54 +425,58 @@ class PDFBuilder:
 
             # 画横线（在被除数上方）
             horizontal_y = y + 16
-            c.setLineWidth(1.5)
+            self._set_line_width(c, 1.5)
             c.line(vertical_line_x, horizontal_y,
                    dividend_x + dividend_width, horizontal_y)
 
             # 画竖线（从横线垂直向下，到被除数下方）
             c.line(vertical_line_x, y - 10,
                    vertical_line_x, horizontal_y)
-            c.setLineWidth(1)
+            self._set_line_width(c, 1)
 
             # 商的答案框（在横线上方）
-            c.setFont(self.font_name, 10)
+            self._set_font(c, 10)
             c.drawString(dividend_x, horizontal_y + 5, "(          )")
 
     def _draw_fill_questions(self, c: canvas.Canvas, questions: List, y: float) -> float:
         """绘制填空题"""
-        c.setFont(self.font_name, 11)
-
         row_height = 25
+        text = None
 
         for i, q in enumerate(questions):
-            current_y = y - i * row_height
+            y, text = self._ensure_text_space(c, text, y, row_height, 11)
 
             # 题号和题目
-            text = f"{i + 1}. {q.question}"
-            c.drawString(self.margin_left, current_y, text)
+            text.setTextOrigin(self.margin_left, y)
+            text.textOut(f"{i + 1}. {q.question}")
 
-        return y - len(questions) * row_height - 15
+            y -= row_height
+
+        if text is not None:
+            c.drawText(text)
+
+        return y - 15
 
     def _draw_list_vertical_questions(self, c: canvas.Canvas, questions: List, y: float) -> float:
         """绘制列竖式计算题"""
-        c.setFont(self.font_name, 11)
-
         question_height = 70  # 每道题预留空间
 
         for i, q in enumerate(questions):
-            current_y = y - i * question_height
+            y = self._ensure_space(c, y, question_height)
 
             # 题号和题目
+            self._set_font(c, 11)
             text = f"{i + 1}. {q.question}"
-            c.drawString(self.margin_left, current_y, text)
+            c.drawString(self.margin_left, y, text)
 
             # 提示文字
             hint = "（请在下方列竖式计算）"
-            c.setFont(self.font_name, 9)
-            c.drawString(self.margin_left + 200, current_y, hint)
-            c.setFont(self.font_name, 11)
+            self._set_font(c, 9)
+            c.drawString(self.margin_left + 200, y, hint)
 
-        return y - len(questions) * question_height - 10
+            y -= question_height
+
+        return y - 10
 
     def _draw_answer_page(self,
                          c: canvas.Canvas,
@@ -387,18 +489,18 @@ class PDFBuilder:
         y = self.page_height - self.margin_top
 
         # 标题（绿色）
-        c.setFillColor(colors.HexColor('#43a047'))
-        c.setFont(self.font_name, 18)
-        c.drawCentredString(self.page_width / 2, y, "参考答案")
+        self._set_fill_color(c, _ANSWER_GREEN)
+        self._set_font(c, 18)
+        c.drawCentredString(self._center_x, y, "参考答案")
         y -= 30
 
         # 分隔线（绿色）
-        c.setStrokeColor(colors.HexColor('#43a047'))
-        c.setLineWidth(2)
-        c.line(self.margin_left, y, self.page_width - self.margin_right, y)
-        c.setStrokeColor(colors.black)
-        c.setLineWidth(1)
-        c.setFillColor(colors.black)
+        self._set_stroke_color(c, _ANSWER_GREEN)
+        self._set_line_width(c, 2)
+        c.line(self.margin_left, y, self._right_edge, y)
+        self._set_stroke_color(c, colors.black)
+        self._set_line_width(c, 1)
+        self._set_fill_color(c, colors.black)
 
         y -= 20
 
@@ -420,31 +522,42 @@ class PDFBuilder:
 
     def _draw_answer_section(self, c: canvas.Canvas, title: str, questions: List, y: float) -> float:
         """绘制答案章节"""
-        # 章节标题（深绿色）
-        c.setFillColor(colors.HexColor('#2e7d32'))
-        c.setFont(self.font_name, 12)
+        row_height = 18
+
+        # 章节标题（深绿色），标题下方至少留出一行答案的空间
+        y = self._ensure_space(c, y, 20 + row_height)
+        self._set_fill_color(c, _ANSWER_DARK_GREEN)
+        self._set_font(c, 12)
         c.drawString(self.margin_left, y, title)
         y -= 20
 
-        # 答案内容（黑色）
-        c.setFillColor(colors.black)
-        c.setFont(self.font_name, 10)
-
         # 每行显示5个答案
         answers_per_row = 5
         col_width = self.content_width / answers_per_row
+        text = None
+
+        last = len(questions) - 1
 
         for i, q in enumerate(questions):
-            row = i // answers_per_row
             col = i % answers_per_row
 
+            # 每行开始前检查剩余空间
+            if col == 0:
+                y, text = self._ensure_text_space(c, text, y, row_height, 10)
+
+                # 答案内容（黑色）
+                self._set_fill_color(c, colors.black)
+
             x = self.margin_left + col * col_width
-            current_y = y - row * 18
 
             # 答案文本
-            answer_text = f"{i + 1}. {q.answer}"
-            c.drawString(x, current_y, answer_text)
+            text.setTextOrigin(x, y)
+            text.textOut(f"{i + 1}. {q.answer}")
 
-        # 计算总高度
-        total_rows = (len(questions) + answers_per_row - 1) // answers_per_row
-        return y - total_rows * 18 - 25
+            if col == answers_per_row - 1 or i == last:
+                y -= row_height
+
+        if text is not None:
+            c.drawText(text)
+
+        return y - 25
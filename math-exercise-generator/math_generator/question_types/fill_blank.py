@@ -2,7 +2,9 @@
 填空题生成器
 """
 import random
-from typing import List, Tuple, Dict, Any
+from collections import Counter
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Optional, Mapping
 from dataclasses import dataclass
 from ..operations import (
     AdditionGenerator,
@@ -10,6 +12,22 @@ from ..operations import (
     MultiplicationGenerator,
     DivisionGenerator
 )
+from .pattern import parse_pattern
+
+
+# 默认的位数配置（只读，模块加载时创建一次）
+_DEFAULT_CONFIGS = MappingProxyType({
+    'add': ('2x2', '3x2', '3x3'),
+    'sub': ('2x2', '3x2', '3x3'),
+    'mul': ('2x1', '2x2'),
+    'div': ('2x1', '3x1')
+})
+
+
+# 题目模板（按留空位置划分，所有运算共用）
+_LEFT_TMPL = "(      ) {op} {b} = {r}"
+_RIGHT_TMPL = "{a} {op} (      ) = {r}"
+_RES_TMPL = "{a} {op} {b} = (      )"
 
 
 @dataclass
@@ -23,6 +41,15 @@ class FillBlankQuestion:
 class FillBlankGenerator:
     """填空题生成器"""
 
+    # 运算类型 -> (数字生成函数, 运算符号)，类定义时解析一次
+    # 除法只取前三项 (被除数, 除数, 商)，整除保证没有余数
+    _OP_MAP = {
+        'add': (AdditionGenerator.generate, '+'),
+        'sub': (SubtractionGenerator.generate, '-'),
+        'mul': (MultiplicationGenerator.generate, '×'),
+        'div': (DivisionGenerator.generate_exact_division, '÷'),
+    }
+
     def __init__(self, config: Dict[str, Any] = None):
         """初始化填空题生成器"""
         self.config = config or {}
@@ -48,101 +75,99 @@ class FillBlankGenerator:
         if digit_configs is None:
             digit_configs = self._get_default_configs()
 
-        questions = []
+        # 先检查运算类型名称，拼写错误的运算类型不能被下面的过滤悄悄丢掉
+        for op in operations:
+            if op not in self._OP_MAP:
+                raise ValueError(f"不支持的运算类型: {op}")
+
+        # 只保留配置了位数的运算类型，全部被过滤时直接返回
+        operations = [op for op in operations if op in digit_configs]
+        if not operations:
+            return []
+
+        # 先一次性抽取每道题的运算类型，再按运算类型批量抽取位数模式
+        ops = random.choices(operations, k=count)
+        pattern_iters = {
+            op: iter(random.choices(digit_configs.get(op) or ['2x2'], k=n))
+            for op, n in Counter(ops).items()
+        }
+        plan = [(op, next(pattern_iters[op])) for op in ops]
 
-        for i in range(count):
-            op = random.choice(operations)
-            question = self._generate_single(op, digit_configs.get(op, []))
-            questions.append(question)
+        # 减法题按位数模式整批生成
+        sub_counts = Counter(pattern for op, pattern in plan if op == 'sub')
+        sub_pools = {
+            pattern: SubtractionGenerator.generate_many(n, *self._parse_pattern(pattern))
+            for pattern, n in sub_counts.items()
+        }
 
-        return questions
+        # 留空位置同样一次性抽取（除法只在左边或右边留空）
+        div_count = ops.count('div')
+        div_blanks = iter(random.choices(['left', 'right'], k=div_count))
+        other_blanks = iter(random.choices(['left', 'right', 'result'], k=count - div_count))
+
+        return [
+            self._generate_single(
+                op,
+                pattern,
+                sub_pools[pattern].pop() if op == 'sub' else None,
+                next(div_blanks if op == 'div' else other_blanks)
+            )
+            for op, pattern in plan
+        ]
+
+    def _generate_single(self,
+                         operation: str,
+                         pattern: str,
+                         sub_numbers: Optional[Tuple[int, int, int]] = None,
+                         blank_position: Optional[str] = None) -> FillBlankQuestion:
+        """
+        生成单道填空题
 
-    def _generate_single(self, operation: str, digit_patterns: List[str]) -> FillBlankQuestion:
-        """生成单道填空题"""
-        if not digit_patterns:
-            digit_patterns = ['2x2']
+        Args:
+            operation: 运算类型
+            pattern: 位数模式，如 '3x2'
+            sub_numbers: 预先批量生成的减法数字 (a, b, result)，仅减法使用
+            blank_position: 预先抽取的留空位置，为 None 时随机选择
+
+        Returns:
+            填空题
+        """
+        op_entry = self._OP_MAP.get(operation)
+        if op_entry is None:
+            raise ValueError(f"不支持的运算类型: {operation}")
+        gen, symbol = op_entry
 
-        pattern = random.choice(digit_patterns)
         a_digits, b_digits = self._parse_pattern(pattern)
+        numbers = sub_numbers or gen(a_digits, b_digits)
+        a, b, result = numbers[:3]
 
         # 随机决定哪个位置留空（左边、右边或结果）
-        blank_position = random.choice(['left', 'right', 'result'])
-
-        if operation == 'add':
-            a, b, result = AdditionGenerator.generate(a_digits, b_digits)
-
-            if blank_position == 'left':
-                question_text = f"(      ) + {b} = {result}"
-                answer = str(a)
-            elif blank_position == 'right':
-                question_text = f"{a} + (      ) = {result}"
-                answer = str(b)
-            else:  # result
-                question_text = f"{a} + {b} = (      )"
-                answer = str(result)
-
-        elif operation == 'sub':
-            a, b, result = SubtractionGenerator.generate(a_digits, b_digits)
-
-            if blank_position == 'left':
-                question_text = f"(      ) - {b} = {result}"
-                answer = str(a)
-            elif blank_position == 'right':
-                question_text = f"{a} - (      ) = {result}"
-                answer = str(b)
-            else:  # result
-                question_text = f"{a} - {b} = (      )"
-                answer = str(result)
-
-        elif operation == 'mul':
-            a, b, result = MultiplicationGenerator.generate(a_digits, b_digits)
-
-            if blank_position == 'left':
-                question_text = f"(      ) × {b} = {result}"
-                answer = str(a)
-            elif blank_position == 'right':
-                question_text = f"{a} × (      ) = {result}"
-                answer = str(b)
-            else:  # result
-                question_text = f"{a} × {b} = (      )"
-                answer = str(result)
-
-        elif operation == 'div':
-            dividend, divisor, quotient, remainder = DivisionGenerator.generate_exact_division(a_digits, b_digits)
-
-            # 除法只在左边或右边留空，结果不留空（太复杂）
-            blank_pos = random.choice(['left', 'right'])
-
-            if blank_pos == 'left':
-                question_text = f"(      ) ÷ {divisor} = {quotient}"
-                answer = str(dividend)
+        # 除法只在左边或右边留空，结果不留空（太复杂）
+        if blank_position is None:
+            if operation == 'div':
+                blank_position = random.choice(['left', 'right'])
             else:
-                question_text = f"{dividend} ÷ (      ) = {quotient}"
-                answer = str(divisor)
+                blank_position = random.choice(['left', 'right', 'result'])
 
-        else:
-            raise ValueError(f"不支持的运算类型: {operation}")
+        if blank_position == 'left':
+            template, answer = _LEFT_TMPL, a
+        elif blank_position == 'right':
+            template, answer = _RIGHT_TMPL, b
+        else:  # result
+            template, answer = _RES_TMPL, result
 
         return FillBlankQuestion(
-            question=question_text,
-            answer=answer,
+            question=template.format(op=symbol, a=a, b=b, r=result),
+            answer=str(answer),
             operation=operation
         )
 
     @staticmethod
     def _parse_pattern(pattern: str) -> Tuple[int, int]:
-        """解析位数模式"""
-        parts = pattern.lower().split('x')
-        if len(parts) != 2:
-            raise ValueError(f"无效的位数模式: {pattern}")
-        return int(parts[0]), int(parts[1])
+        """解析位数模式（结果按模式字符串缓存）"""
+        return parse_pattern(pattern)
 
     @staticmethod
-    def _get_default_configs() -> Dict[str, List[str]]:
+    def _get_default_configs() -> Mapping[str, Tuple[str, ...]]:
         """获取默认配置"""
-        return {
-            'add': ['2x2', '3x2', '3x3'],
-            'sub': ['2x2', '3x2', '3x3'],
-            'mul': ['2x1', '2x2'],
-            'div': ['2x1', '3x1']
-        }
+        return _DEFAULT_CONFIGS
@@ -3,7 +3,9 @@
 给出横式，要求学生列竖式计算
 """
 import random
-from typing import List, Tuple, Dict, Any
+from collections import Counter
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Optional, Mapping
 from dataclasses import dataclass
 from ..operations import (
     AdditionGenerator,
@@ -11,6 +13,21 @@ from ..operations import (
     MultiplicationGenerator,
     DivisionGenerator
 )
+from .pattern import parse_pattern
+
+
+# 默认的位数配置（只读，模块加载时创建一次）
+_DEFAULT_CONFIGS = MappingProxyType({
+    'add': ('3x3', '4x3', '4x4'),
+    'sub': ('3x3', '4x3', '4x4'),
+    'mul': ('2x2', '3x2'),
+    'div': ('3x1', '4x2')
+})
+
+
+# 题目模板（所有运算共用，有余数的除法额外追加余数空位）
+_QUESTION_TMPL = "{a} {op} {b} = ___"
+_REMAINDER_SUFFIX = " ... ___"
 
 
 @dataclass
@@ -25,6 +42,14 @@ class ListVerticalQuestion:
 class ListVerticalGenerator:
     """列竖式计算题生成器"""
 
+    # 运算类型 -> (数字生成函数, 运算符号)，类定义时解析一次
+    _OP_MAP = {
+        'add': (AdditionGenerator.generate, '+'),
+        'sub': (SubtractionGenerator.generate, '-'),
+        'mul': (MultiplicationGenerator.generate, '×'),
+        'div': (DivisionGenerator.generate, '÷'),
+    }
+
     def __init__(self, config: Dict[str, Any] = None):
         """初始化列竖式生成器"""
         self.config = config or {}
@@ -50,53 +75,67 @@ class ListVerticalGenerator:
         if digit_configs is None:
             digit_configs = self._get_default_configs()
 
-        questions = []
+        # 先检查运算类型名称，拼写错误的运算类型不能被下面的过滤悄悄丢掉
+        for op in operations:
+            if op not in self._OP_MAP:
+                raise ValueError(f"不支持的运算类型: {op}")
+
+        # 只保留配置了位数的运算类型，全部被过滤时直接返回
+        operations = [op for op in operations if op in digit_configs]
+        if not operations:
+            return []
+
+        # 先一次性抽取每道题的运算类型，再按运算类型批量抽取位数模式
+        ops = random.choices(operations, k=count)
+        pattern_iters = {
+            op: iter(random.choices(digit_configs.get(op) or ['3x3'], k=n))
+            for op, n in Counter(ops).items()
+        }
+        plan = [(op, next(pattern_iters[op])) for op in ops]
 
-        for i in range(count):
-            op = random.choice(operations)
-            question = self._generate_single(op, digit_configs.get(op, []))
-            questions.append(question)
+        # 减法题按位数模式整批生成
+        sub_counts = Counter(pattern for op, pattern in plan if op == 'sub')
+        sub_pools = {
+            pattern: SubtractionGenerator.generate_many(n, *self._parse_pattern(pattern))
+            for pattern, n in sub_counts.items()
+        }
 
-        return questions
+        return [
+            self._generate_single(op, pattern, sub_pools[pattern].pop() if op == 'sub' else None)
+            for op, pattern in plan
+        ]
 
-    def _generate_single(self, operation: str, digit_patterns: List[str]) -> ListVerticalQuestion:
-        """生成单道列竖式题"""
-        if not digit_patterns:
-            digit_patterns = ['3x3']
+    def _generate_single(self,
+                         operation: str,
+                         pattern: str,
+                         sub_numbers: Optional[Tuple[int, int, int]] = None) -> ListVerticalQuestion:
+        """
+        生成单道列竖式题
 
-        pattern = random.choice(digit_patterns)
-        a_digits, b_digits = self._parse_pattern(pattern)
+        Args:
+            operation: 运算类型
+            pattern: 位数模式，如 '3x2'
+            sub_numbers: 预先批量生成的减法数字 (a, b, result)，仅减法使用
 
-        if operation == 'add':
-            a, b, result = AdditionGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} + {b} = ___"
-            answer = str(result)
-            numbers = (a, b, result)
-
-        elif operation == 'sub':
-            a, b, result = SubtractionGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} - {b} = ___"
-            answer = str(result)
-            numbers = (a, b, result)
-
-        elif operation == 'mul':
-            a, b, result = MultiplicationGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} × {b} = ___"
-            answer = str(result)
-            numbers = (a, b, result)
-
-        elif operation == 'div':
-            dividend, divisor, quotient, remainder = DivisionGenerator.generate(a_digits, b_digits)
-            if remainder == 0:
-                question_text = f"{dividend} ÷ {divisor} = ___"
-                answer = str(quotient)
-            else:
-                question_text = f"{dividend} ÷ {divisor} = ___ ... ___"
-                answer = f"{quotient}...{remainder}"
-            numbers = (dividend, divisor, quotient, remainder)
-
-        else:
+        Returns:
+            列竖式题
+        """
+        op_entry = self._OP_MAP.get(operation)
+        if op_entry is None:
             raise ValueError(f"不支持的运算类型: {operation}")
+        gen, symbol = op_entry
+
+        a_digits, b_digits = self._parse_pattern(pattern)
+        numbers = sub_numbers or gen(a_digits, b_digits)
+
+        a, b, result = numbers[:3]
+        question_text = _QUESTION_TMPL.format(op=symbol, a=a, b=b)
+        answer = str(result)
+
+        # 有余数的除法需要额外填写余数
+        if operation == 'div' and numbers[3]:
+            question_text += _REMAINDER_SUFFIX
+            answer = f"{result}...{numbers[3]}"
 
         return ListVerticalQuestion(
             question=question_text,
@@ -107,18 +146,10 @@ class ListVerticalGenerator:
 
     @staticmethod
     def _parse_pattern(pattern: str) -> Tuple[int, int]:
-        """解析位数模式"""
-        parts = pattern.lower().split('x')
-        if len(parts) != 2:
-            raise ValueError(f"无效的位数模式: {pattern}")
-        return int(parts[0]), int(parts[1])
+        """解析位数模式（结果按模式字符串缓存）"""
+        return parse_pattern(pattern)
 
     @staticmethod
-    def _get_default_configs() -> Dict[str, List[str]]:
+    def _get_default_configs() -> Mapping[str, Tuple[str, ...]]:
         """获取默认配置"""
-        return {
-            'add': ['3x3', '4x3', '4x4'],
-            'sub': ['3x3', '4x3', '4x4'],
-            'mul': ['2x2', '3x2'],
-            'div': ['3x1', '4x2']
-        }
+        return _DEFAULT_CONFIGS
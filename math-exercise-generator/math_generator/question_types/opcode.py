@@ -0,0 +1,24 @@
+"""
+运算类型编码
+"""
+from enum import IntEnum
+
+
+class OpCode(IntEnum):
+    """运算类型编码（整数比较代替字符串比较，也可直接作为元组下标）"""
+    ADD = 0
+    SUB = 1
+    MUL = 2
+    DIV = 3
+
+
+# 运算类型名称 -> 编码
+OP_CODES = {
+    'add': OpCode.ADD,
+    'sub': OpCode.SUB,
+    'mul': OpCode.MUL,
+    'div': OpCode.DIV,
+}
+
+# 编码 -> 运算类型名称（按编码顺序排列）
+OP_NAMES = ('add', 'sub', 'mul', 'div')
@@ -2,7 +2,9 @@
 口算题生成器
 """
 import random
-from typing import List, Tuple, Dict, Any
+from collections import Counter
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Mapping
 from dataclasses import dataclass
 from ..operations import (
     AdditionGenerator,
@@ -10,9 +12,28 @@ from ..operations import (
     MultiplicationGenerator,
     DivisionGenerator
 )
+from .pattern import parse_pattern
 
 
-@dataclass
+# 默认的位数配置（只读，模块加载时创建一次）
+_DEFAULT_CONFIGS = MappingProxyType({
+    'add': ('2x2', '3x2', '3x3'),
+    'sub': ('2x2', '3x2', '3x3'),
+    'mul': ('2x1', '2x2', '3x1'),
+    'div': ('2x1', '3x1')
+})
+
+
+# 各运算的题目格式化函数（预先绑定模板的 format 方法）
+_QUESTION_FMT = {
+    'add': '{} + {} ='.format,
+    'sub': '{} - {} ='.format,
+    'mul': '{} × {} ='.format,
+    'div': '{} ÷ {} ='.format,
+}
+
+
+@dataclass(slots=True)
 class OralQuestion:
     """口算题数据类"""
     question: str  # 题目文本，如 "23 + 45 = ___"
@@ -23,6 +44,14 @@ class OralQuestion:
 class OralQuestionGenerator:
     """口算题生成器"""
 
+    # 运算类型 -> 批量生成数字的函数 (count, a_digits, b_digits) -> 数字元组列表
+    _OP_GEN = {
+        'add': AdditionGenerator.generate_many,
+        'sub': SubtractionGenerator.generate_many,
+        'mul': MultiplicationGenerator.generate_many,
+        'div': DivisionGenerator.generate_many,
+    }
+
     def __init__(self, config: Dict[str, Any] = None):
         """
         初始化口算题生成器
@@ -54,92 +83,82 @@ class OralQuestionGenerator:
         if digit_configs is None:
             digit_configs = self._get_default_configs()
 
-        questions = []
-
-        for i in range(count):
-            # 随机选择运算类型
-            op = random.choice(operations)
+        # 先检查运算类型名称，拼写错误的运算类型不能被下面的过滤悄悄丢掉
+        for op in operations:
+            if op not in self._OP_GEN:
+                raise ValueError(f"不支持的运算类型: {op}")
+
+        # 只保留配置了位数的运算类型，全部被过滤时直接返回
+        operations = [op for op in operations if op in digit_configs]
+        if not operations:
+            return []
+
+        # 一次性抽取每道题的运算类型，再按运算类型批量抽取位数模式
+        ops = random.choices(operations, k=count)
+        pattern_iters = {
+            op: iter(random.choices(digit_configs.get(op) or ['2x2'], k=n))
+            for op, n in Counter(ops).items()
+        }
+        plan = [(op, next(pattern_iters[op])) for op in ops]
 
-            # 生成题目
-            question = self._generate_single(op, digit_configs.get(op, []))
-            questions.append(question)
+        # 按 (运算类型, 位数模式) 分组，每组一次性生成全部数字
+        pools = {
+            key: self._generate_numbers(*key, n)
+            for key, n in Counter(plan).items()
+        }
 
-        return questions
+        return [self._make_question(op, pools[(op, pattern)].pop()) for op, pattern in plan]
 
-    def _generate_single(self, operation: str, digit_patterns: List[str]) -> OralQuestion:
+    def _generate_numbers(self, operation: str, pattern: str, count: int) -> List[Tuple]:
         """
-        生成单道口算题
+        按位数模式批量生成同一运算类型的数字
 
         Args:
             operation: 运算类型
-            digit_patterns: 位数模式列表，如 ['2x2', '3x1']
+            pattern: 位数模式，如 '3x2'
+            count: 生成数量
 
         Returns:
-            口算题对象
+            数字元组列表（加减乘: (a, b, result)，除法: (dividend, divisor, quotient, remainder)）
         """
-        if not digit_patterns:
-            digit_patterns = ['2x2']
-
-        # 随机选择位数模式
-        pattern = random.choice(digit_patterns)
-        a_digits, b_digits = self._parse_pattern(pattern)
-
-        if operation == 'add':
-            a, b, result = AdditionGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} + {b} ="
-            answer = str(result)
-
-        elif operation == 'sub':
-            a, b, result = SubtractionGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} - {b} ="
-            answer = str(result)
-
-        elif operation == 'mul':
-            a, b, result = MultiplicationGenerator.generate(a_digits, b_digits)
-            question_text = f"{a} × {b} ="
-            answer = str(result)
-
-        elif operation == 'div':
-            dividend, divisor, quotient, remainder = DivisionGenerator.generate(a_digits, b_digits)
-            if remainder == 0:
-                question_text = f"{dividend} ÷ {divisor} ="
-                answer = str(quotient)
-            else:
-                question_text = f"{dividend} ÷ {divisor} ="
-                answer = f"{quotient}...{remainder}"
-
-        else:
+        gen = self._OP_GEN.get(operation)
+        if gen is None:
             raise ValueError(f"不支持的运算类型: {operation}")
 
-        return OralQuestion(
-            question=question_text,
-            answer=answer,
-            operation=operation
-        )
+        return gen(count, *self._parse_pattern(pattern))
 
     @staticmethod
-    def _parse_pattern(pattern: str) -> Tuple[int, int]:
+    def _make_question(operation: str, numbers: Tuple) -> OralQuestion:
         """
-        解析位数模式
+        根据已生成的数字组装口算题
 
         Args:
-            pattern: 如 "3x2" 表示 3位数 × 2位数
+            operation: 运算类型
+            numbers: _generate_numbers 生成的数字元组
 
         Returns:
-            (a_digits, b_digits) 元组
+            口算题对象
         """
-        parts = pattern.lower().split('x')
-        if len(parts) != 2:
-            raise ValueError(f"无效的位数模式: {pattern}")
+        a, b, result = numbers[:3]
+        question_text = _QUESTION_FMT[operation](a, b)
+        answer = str(result)
+
+        # 有余数的除法答案带上余数
+        if operation == 'div' and numbers[3]:
+            answer = f"{result}...{numbers[3]}"
+
+        return OralQuestion(
+            question=question_text,
+            answer=answer,
+            operation=operation
+        )
 
-        return int(parts[0]), int(parts[1])
+    @staticmethod
+    def _parse_pattern(pattern: str) -> Tuple[int, int]:
+        """解析位数模式（结果按模式字符串缓存）"""
+        return parse_pattern(pattern)
 
     @staticmethod
-    def _get_default_configs() -> Dict[str, List[str]]:
+    def _get_default_configs() -> Mapping[str, Tuple[str, ...]]:
         """获取默认的位数配置（三年级水平）"""
-        return {
-            'add': ['2x2', '3x2', '3x3'],
-            'sub': ['2x2', '3x2', '3x3'],
-            'mul': ['2x1', '2x2', '3x1'],
-            'div': ['2x1', '3x1']
-        }
+        return _DEFAULT_CONFIGS
@@ -0,0 +1,22 @@
+"""
+位数模式解析
+"""
+from functools import lru_cache
+from typing import Tuple
+
+
+@lru_cache(maxsize=32)
+def parse_pattern(pattern: str) -> Tuple[int, int]:
+    """
+    解析位数模式
+
+    Args:
+        pattern: 如 "3x2" 表示 3位数 × 2位数
+
+    Returns:
+        (a_digits, b_digits) 元组
+    """
+    parts = pattern.lower().split('x')
+    if len(parts) != 2:
+        raise ValueError(f"无效的位数模式: {pattern}")
+    return int(parts[0]), int(parts[1])
@@ -2,7 +2,10 @@
 竖式计算题生成器
 """
 import random
-from typing import List, Tuple, Dict, Any
+from collections import Counter
+from functools import lru_cache
+from types import MappingProxyType
+from typing import List, Tuple, Dict, Any, Mapping
 from dataclasses import dataclass
 from ..operations import (
     AdditionGenerator,
@@ -10,20 +13,61 @@ from ..operations import (
     MultiplicationGenerator,
     DivisionGenerator
 )
+from .pattern import parse_pattern
+from .opcode import OpCode, OP_CODES, OP_NAMES
 
 
-@dataclass
+# 默认的位数配置（只读，模块加载时创建一次）
+_DEFAULT_CONFIGS = MappingProxyType({
+    'add': ('3x3', '3x2', '4x3'),
+    'sub': ('3x3', '3x2', '4x3'),
+    'mul': ('2x2', '3x1', '3x2'),
+    'div': ('3x1', '4x1', '4x2')
+})
+
+
+@lru_cache(maxsize=None)
+def _spaced(n: int, width: int = 0) -> str:
+    """将数字补零到指定宽度后逐位加空格，如 _spaced(45, 3) -> '0 4 5'"""
+    return ' '.join(str(n).zfill(width))
+
+
+@dataclass(slots=True)
 class VerticalQuestion:
     """竖式计算题数据类"""
     operation: str  # 运算类型
     numbers: Tuple  # 运算的数字（加减乘: 2个，除法: 4个包含商和余数）
     answer: str  # 答案
     show_work: bool = False  # 是否显示计算过程
+    a_spaced: str = ""  # 排版用：第一个数（除法为被除数）逐位加空格
+    b_spaced: str = ""  # 排版用：第二个数逐位加空格（除法为空）
+
+    def __post_init__(self):
+        """创建时预先计算竖式排版字符串，绘制时直接读取"""
+        if self.a_spaced:
+            return
+
+        a, b = self.numbers[:2]
+        if self.operation == 'div':
+            self.a_spaced = _spaced(a)
+        else:
+            # 对齐到相同长度
+            max_len = max(len(str(a)), len(str(b)))
+            self.a_spaced = _spaced(a, max_len)
+            self.b_spaced = _spaced(b, max_len)
 
 
 class VerticalQuestionGenerator:
     """竖式计算题生成器"""
 
+    # 数字生成函数，按 OpCode 下标排列，类定义时解析一次
+    _OP_GEN = (
+        AdditionGenerator.generate,
+        SubtractionGenerator.generate,
+        MultiplicationGenerator.generate,
+        DivisionGenerator.generate,
+    )
+
     def __init__(self, config: Dict[str, Any] = None):
         """
         初始化竖式题生成器
@@ -54,72 +98,64 @@ class VerticalQuestionGenerator:
         if digit_configs is None:
             digit_configs = self._get_default_configs()
 
-        questions = []
+        # 先检查运算类型名称，拼写错误的运算类型不能被下面的过滤悄悄丢掉
+        for op in operations:
+            if op not in OP_CODES:
+                raise ValueError(f"不支持的运算类型: {op}")
 
-        for i in range(count):
-            op = random.choice(operations)
-            question = self._generate_single(op, digit_configs.get(op, []))
-            questions.append(question)
+        # 只保留配置了位数的运算类型，全部被过滤时直接返回
+        operations = [op for op in operations if op in digit_configs]
+        if not operations:
+            return []
 
-        return questions
+        # 运算类型名称在入口处一次性转换为整数编码
+        op_codes = [OP_CODES[op] for op in operations]
 
-    def _generate_single(self, operation: str, digit_patterns: List[str]) -> VerticalQuestion:
-        """生成单道竖式题"""
-        if not digit_patterns:
-            digit_patterns = ['2x2']
+        # 先一次性抽取每道题的运算类型，再按运算类型批量抽取位数模式
+        codes = random.choices(op_codes, k=count)
+        pattern_iters = {
+            code: iter(random.choices(digit_configs.get(OP_NAMES[code]) or ['2x2'], k=n))
+            for code, n in Counter(codes).items()
+        }
 
-        pattern = random.choice(digit_patterns)
-        a_digits, b_digits = self._parse_pattern(pattern)
+        return [self._generate_single(code, next(pattern_iters[code])) for code in codes]
 
-        if operation == 'add':
-            a, b, result = AdditionGenerator.generate(a_digits, b_digits)
-            return VerticalQuestion(
-                operation='add',
-                numbers=(a, b),
-                answer=str(result)
-            )
+    def _generate_single(self, op_code: OpCode, pattern: str) -> VerticalQuestion:
+        """
+        生成单道竖式题
 
-        elif operation == 'sub':
-            a, b, result = SubtractionGenerator.generate(a_digits, b_digits)
-            return VerticalQuestion(
-                operation='sub',
-                numbers=(a, b),
-                answer=str(result)
-            )
+        Args:
+            op_code: 运算类型编码
+            pattern: 位数模式，如 '3x2'
 
-        elif operation == 'mul':
-            a, b, result = MultiplicationGenerator.generate(a_digits, b_digits)
-            return VerticalQuestion(
-                operation='mul',
-                numbers=(a, b),
-                answer=str(result)
-            )
+        Returns:
+            竖式题对象
+        """
+        a_digits, b_digits = self._parse_pattern(pattern)
 
-        elif operation == 'div':
-            dividend, divisor, quotient, remainder = DivisionGenerator.generate(a_digits, b_digits)
+        numbers = self._OP_GEN[op_code](a_digits, b_digits)
+
+        if op_code == OpCode.DIV:
+            dividend, divisor, quotient, remainder = numbers
             return VerticalQuestion(
                 operation='div',
-                numbers=(dividend, divisor, quotient, remainder),
+                numbers=numbers,
                 answer=f"{quotient}" + (f"...{remainder}" if remainder > 0 else "")
             )
 
-        else:
-            raise ValueError(f"不支持的运算类型: {operation}")
+        a, b, result = numbers
+        return VerticalQuestion(
+            operation=OP_NAMES[op_code],
+            numbers=(a, b),
+            answer=str(result)
+        )
 
     @staticmethod
     def _parse_pattern(pattern: str) -> Tuple[int, int]:
-        """解析位数模式"""
-        parts = pattern.lower().split('x')
-        if len(parts) != 2:
-            raise ValueError(f"无效的位数模式: {pattern}")
-        return int(parts[0]), int(parts[1])
+        """解析位数模式（结果按模式字符串缓存）"""
+        return parse_pattern(pattern)
 
     @staticmethod
-    def _get_default_configs() -> Dict[str, List[str]]:
+    def _get_default_configs() -> Mapping[str, Tuple[str, ...]]:
         """获取默认配置"""
-        return {
-            'add': ['3x3', '3x2', '4x3'],
-            'sub': ['3x3', '3x2', '4x3'],
-            'mul': ['2x2', '3x1', '3x2'],
-            'div': ['3x1', '4x1', '4x2']
-        }
+        return _DEFAULT_CONFIGS
@@ -2,11 +2,167 @@
 AI 提供者抽象层
 支持 Claude 和 OpenAI 两种 AI 模型
 """
+import importlib.util
 import os
+import tempfile
 from abc import ABC, abstractmethod
-from typing import Dict, Any, List, Optional
+from functools import lru_cache
+from typing import Dict, Any, Iterable, List, Optional
 from pathlib import Path
 import base64
+import hashlib
+import json
+import re
+
+try:
+    import orjson
+except ImportError:  # orjson 为可选依赖，未安装时使用标准库 json
+    orjson = None
+
+
+# 图片扩展名 -> MIME 类型
+_MIME_TYPES = {
+    '.jpg': 'image/jpeg',
+    '.jpeg': 'image/jpeg',
+    '.png': 'image/png',
+    '.gif': 'image/gif',
+    '.webp': 'image/webp'
+}
+
+# markdown 代码块的开始标记（必须位于行首，可带 json 标记，不区分大小写）
+_JSON_FENCE_RE = re.compile(r"^```(?:json)?", re.MULTILINE | re.IGNORECASE)
+
+# 缓存的 base64 编码结果数：同一张图片被连续多次分析（如先分组再识别题目）时复用，
+# 手机照片编码后可达数 MB，只保留最近几张
+_ENCODED_IMAGE_CACHE_SIZE = 4
+
+# 计算文件摘要时每次读取的字节数
+_HASH_CHUNK_SIZE = 1 << 20
+
+# HTTP 连接池大小：并发线程共用 keep-alive 连接，免去重复的 TCP/TLS 握手
+_HTTP_MAX_CONNECTIONS = 16
+_HTTP_MAX_KEEPALIVE = 16
+
+
+def dumps_json(obj: Any) -> str:
+    """序列化为缩进 2 格、保留中文的 JSON 字符串（优先使用 orjson）"""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2)
+
+
+def extract_json_text(text: str) -> str:
+    """
+    取出模型响应中的 JSON 文本（去掉 markdown 代码块标记和前后的说明文字）
+
+    代码块内容取到最后一个结束标记为止（缺少结束标记时取到文本末尾），
+    JSON 字符串值中含有 ``` 时不会被截断。
+    """
+    fence = _JSON_FENCE_RE.search(text)
+    if fence is None:
+        return text.strip()
+    body = text[fence.end():]
+    end = body.rfind("```")
+    if end != -1:
+        body = body[:end]
+    return body.strip()
+
+
+def loads_json(text: str) -> Any:
+    """
+    解析 JSON 字符串（优先使用 orjson）
+
+    orjson.JSONDecodeError 是 json.JSONDecodeError 的子类，
+    调用方统一捕获 json.JSONDecodeError 即可。
+    """
+    if orjson is not None:
+        return orjson.loads(text)
+    return json.loads(text)
+
+
+def file_digest(path: Path, salt: str = "") -> str:
+    """
+    计算文件内容的 BLAKE2b 摘要，用作结果缓存的键
+
+    Args:
+        path: 文件路径
+        salt: 与文件内容一起参与摘要的字符串（如模型名称），换模型后缓存自动失效
+
+    Returns:
+        32 位十六进制摘要
+    """
+    digest = hashlib.blake2b(salt.encode("utf-8"), digest_size=16)
+    with open(path, "rb") as f:
+        while chunk := f.read(_HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def read_json_file(path: Path) -> Any:
+    """读取 JSON 文件，文件不存在或已损坏时返回 None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return loads_json(f.read())
+    except (OSError, ValueError):
+        return None
+
+
+def write_atomic(path: Path, chunks: Iterable[str]) -> None:
+    """
+    写入文本文件：先在同一目录写临时文件再整体替换，
+    写入中途退出不会损坏原文件，并发读取也不会读到写了一半的内容
+
+    Raises:
+        OSError: 写入失败
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    f = tempfile.NamedTemporaryFile(
+        "w", encoding="utf-8", dir=path.parent, suffix=".tmp", delete=False
+    )
+    try:
+        with f:
+            f.writelines(chunks)
+        os.replace(f.name, path)
+    except BaseException:
+        # 写入失败（磁盘已满、生成内容时出错等）时删除临时文件，不留下孤立的 .tmp
+        os.unlink(f.name)
+        raise
+
+
+def write_json_atomic(path: Path, obj: Any) -> None:
+    """以 dumps_json 的格式原子地写入 JSON 文件（失败时抛出 OSError）"""
+    write_atomic(path, (dumps_json(obj),))
+
+
+def new_http_client():
+    """
+    创建带连接池的 httpx 客户端，供各 AI SDK 使用（所有调用方共用同一套连接池配置）
+
+    超时由各 SDK 按请求设置。httpx 在这里才导入，只生成数学题等不用 AI 的场景无需加载。
+    """
+    import httpx
+
+    return httpx.Client(
+        # HTTP/2 需要可选依赖 h2，未安装时使用 HTTP/1.1
+        http2=importlib.util.find_spec("h2") is not None,
+        limits=httpx.Limits(
+            max_connections=_HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=_HTTP_MAX_KEEPALIVE
+        )
+    )
+
+
+@lru_cache(maxsize=256)
+def _mime_for_suffix(suffix: str) -> str:
+    """按扩展名查找 MIME 类型（不区分大小写，结果缓存），未知扩展名按 JPEG 处理"""
+    return _MIME_TYPES.get(suffix.lower(), 'image/jpeg')
+
+
+@lru_cache(maxsize=_ENCODED_IMAGE_CACHE_SIZE)
+def _encode_image_cached(path_str: str, mtime: float, size: int) -> str:
+    """读取并 base64 编码图片（按路径、修改时间和大小缓存最近几张，文件变化后自动失效）"""
+    with open(path_str, "rb") as image_file:
+        return base64.standard_b64encode(image_file.read()).decode("ascii")
 
 
 class AIProvider(ABC):
@@ -96,8 +252,8 @@ class AIProvider(ABC):
         Returns:
             base64 编码的图片字符串
         """
-        with open(image_path, "rb") as image_file:
-            return base64.standard_b64encode(image_file.read()).decode("utf-8")
+        st = os.stat(image_path)
+        return _encode_image_cached(str(image_path), st.st_mtime, st.st_size)
 
     @staticmethod
     def get_image_mime_type(image_path: Path) -> str:
@@ -110,21 +266,18 @@ class AIProvider(ABC):
         Returns:
             MIME 类型字符串
         """
-        suffix = image_path.suffix.lower()
-        mime_types = {
-            '.jpg': 'image/jpeg',
-            '.jpeg': 'image/jpeg',
-            '.png': 'image/png',
-            '.gif': 'image/gif',
-            '.webp': 'image/webp'
-        }
-        return mime_types.get(suffix, 'image/jpeg')
+        return _mime_for_suffix(image_path.suffix)
 
 
+@lru_cache(maxsize=4)
 def get_ai_provider(provider_name: Optional[str] = None) -> AIProvider:
     """
     获取 AI 提供者实例
 
+    同一 provider_name 的实例会被缓存复用（共享客户端及其连接池），
+    环境变量读取只在首次调用时进行；修改环境变量后需调用
+    get_ai_provider.cache_clear() 才能生效。
+
     Args:
         provider_name: 提供者名称（'claude' 或 'openai'），如果不指定则从环境变量读取
 
@@ -134,14 +287,13 @@ def get_ai_provider(provider_name: Optional[str] = None) -> AIProvider:
     Raises:
         ValueError: 如果提供者名称无效或 API 密钥未配置
     """
-    from .claude_provider import ClaudeProvider
-    from .openai_provider import OpenAIProvider
-
     # 确定使用哪个提供者
     provider = provider_name or os.getenv('DEFAULT_AI_PROVIDER', 'claude')
     provider = provider.lower()
 
     if provider == 'claude':
+        from .claude_provider import ClaudeProvider
+
         # 支持新旧两种环境变量名
         api_key = os.getenv('CLAUDE_API_KEY') or os.getenv('ANTHROPIC_API_KEY')
         model = os.getenv('CLAUDE_MODEL', 'claude-sonnet-4.5-20250929')
@@ -154,6 +306,8 @@ def get_ai_provider(provider_name: Optional[str] = None) -> AIProvider:
         return ClaudeProvider(api_key=api_key, model=model)
 
     elif provider == 'openai':
+        from .openai_provider import OpenAIProvider
+
         api_key = os.getenv('OPENAI_API_KEY')
         model = os.getenv('OPENAI_MODEL', 'gpt-4o')
 
@@ -5,8 +5,11 @@ Claude AI 提供者实现
 import json
 from typing import Dict, Any, Optional
 from pathlib import Path
-from anthropic import Anthropic
-from .ai_provider import AIProvider
+from .ai_provider import AIProvider, dumps_json, extract_json_text, loads_json, new_http_client
+
+
+# 请求失败（限流、超时、5xx）时的自动重试次数
+_MAX_RETRIES = 3
 
 
 class ClaudeProvider(AIProvider):
@@ -20,8 +23,26 @@ class ClaudeProvider(AIProvider):
             api_key: Anthropic API 密钥
             model: Claude 模型名称
         """
+        # 延迟导入 SDK：只生成数学题等不用 AI 的场景无需加载 anthropic/httpx
+        from anthropic import Anthropic
+
         super().__init__(api_key, model)
-        self.client = Anthropic(api_key=api_key)
+        # 连续分析多张图片时复用 keep-alive 连接
+        self._http = new_http_client()
+        self.client = Anthropic(api_key=api_key, http_client=self._http, max_retries=_MAX_RETRIES)
+
+    def close(self) -> None:
+        """关闭底层 HTTP 连接池"""
+        self._http.close()
+
+    def __del__(self):
+        """析构时释放连接池"""
+        http = getattr(self, "_http", None)
+        if http is not None:
+            try:
+                http.close()
+            except Exception:
+                pass
 
     def analyze_image(
         self,
@@ -40,6 +61,43 @@ class ClaudeProvider(AIProvider):
         Returns:
             AI 的文本响应
         """
+        kwargs = self._build_image_request(image_path, prompt, system_prompt)
+        response = self.client.messages.create(**kwargs)
+
+        # 提取文本响应
+        return response.content[0].text
+
+    def text_completion(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4000
+    ) -> str:
+        """
+        Claude 文本生成
+
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            temperature: 温度参数
+            max_tokens: 最大 token 数
+
+        Returns:
+            AI 的文本响应
+        """
+        kwargs = self._build_text_request(prompt, system_prompt, temperature, max_tokens)
+        response = self.client.messages.create(**kwargs)
+
+        return response.content[0].text
+
+    def _build_image_request(
+        self,
+        image_path: Path,
+        prompt: str,
+        system_prompt: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """构建图像分析请求参数"""
         # 编码图像
         image_data = self.encode_image(image_path)
         media_type = self.get_image_mime_type(image_path)
@@ -65,7 +123,6 @@ class ClaudeProvider(AIProvider):
             }
         ]
 
-        # 调用 API
         kwargs = {
             "model": self.model,
             "max_tokens": 4096,
@@ -75,30 +132,16 @@ class ClaudeProvider(AIProvider):
         if system_prompt:
             kwargs["system"] = system_prompt
 
-        response = self.client.messages.create(**kwargs)
+        return kwargs
 
-        # 提取文本响应
-        return response.content[0].text
-
-    def text_completion(
+    def _build_text_request(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
         max_tokens: int = 4000
-    ) -> str:
-        """
-        Claude 文本生成
-
-        Args:
-            prompt: 用户提示词
-            system_prompt: 系统提示词（可选）
-            temperature: 温度参数
-            max_tokens: 最大 token 数
-
-        Returns:
-            AI 的文本响应
-        """
+    ) -> Dict[str, Any]:
+        """构建文本生成请求参数"""
         messages = [
             {
                 "role": "user",
@@ -116,9 +159,7 @@ class ClaudeProvider(AIProvider):
         if system_prompt:
             kwargs["system"] = system_prompt
 
-        response = self.client.messages.create(**kwargs)
-
-        return response.content[0].text
+        return kwargs
 
     def structured_output(
         self,
@@ -141,7 +182,7 @@ class ClaudeProvider(AIProvider):
         json_prompt = f"""{prompt}
 
 请以 JSON 格式返回结果，格式示例：
-{json.dumps(response_format, ensure_ascii=False, indent=2)}
+{dumps_json(response_format)}
 
 只返回 JSON，不要包含任何其他文本。"""
 
@@ -154,15 +195,8 @@ class ClaudeProvider(AIProvider):
         # 尝试解析 JSON
         try:
             # 清理可能的 markdown 代码块标记
-            response_text = response_text.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-
-            return json.loads(response_text)
+            response_text = extract_json_text(response_text)
+
+            return loads_json(response_text)
         except json.JSONDecodeError as e:
             raise ValueError(f"无法解析 Claude 返回的 JSON: {e}\n原始响应: {response_text}")
@@ -17,6 +17,8 @@ PICTURES_DIR = ROOT_DIR / "pictures"
 # 数据目录
 DATA_DIR = ROOT_DIR / "data"
 QUESTION_BANK_PATH = DATA_DIR / "questions.json"
+ANALYSIS_CACHE_DIR = DATA_DIR / "analysis_cache"  # 图片识别结果缓存
+PHOTO_META_CACHE_DIR = DATA_DIR / "photo_meta_cache"  # 照片元数据识别结果缓存
 
 # 输出目录
 OUTPUT_DIR = ROOT_DIR / "output"
@@ -26,6 +28,9 @@ MISTAKE_PAPERS_DIR = OUTPUT_DIR / "mistake_papers"
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY", "")
 CLAUDE_MODEL = "claude-sonnet-4-5-20250929"  # 最新的Claude模型
 
+# 照片分组时并发调用 AI 的线程数（请求以网络等待为主）
+GROUPER_WORKERS = max(1, int(os.getenv("GROUPER_WORKERS", "8")))
+
 # 题目类型
 QUESTION_TYPES = {
     "calculation": "计算题",
@@ -7,11 +7,12 @@
 """
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field
+import heapq
 from collections import defaultdict
 from .question_parser_v2 import QuestionV2
 
 
-@dataclass
+@dataclass(slots=True)
 class KnowledgePointStatus:
     """知识点掌握状态"""
     knowledge_point: str
@@ -24,7 +25,7 @@ class KnowledgePointStatus:
     need_practice: bool
 
 
-@dataclass
+@dataclass(slots=True)
 class ExamPerformance:
     """考试表现分析"""
     exam_id: str
@@ -48,7 +49,7 @@ class ExamPerformance:
     mistake_distribution: Dict[str, int]  # 题型 -> 错题数
 
 
-@dataclass
+@dataclass(slots=True)
 class WeaknessAnalysis:
     """薄弱点分析结果"""
     subject: str
@@ -62,6 +63,14 @@ class WeaknessAnalysis:
     # 考试表现列表
     exam_performances: List[ExamPerformance] = field(default_factory=list)
 
+    def top_weak_points(self, k: int = 3) -> List[KnowledgePointStatus]:
+        """首次正确率最低的 k 个深度薄弱点（无需对整个列表排序）"""
+        return heapq.nsmallest(k, self.weak_points, key=lambda x: x.first_correct_rate)
+
+    def top_consolidate_points(self, k: int = 3) -> List[KnowledgePointStatus]:
+        """订正正确率最高的 k 个可巩固知识点（无需对整个列表排序）"""
+        return heapq.nlargest(k, self.consolidate_points, key=lambda x: x.correction_correct_rate)
+
 
 class DualAnalyzer:
     """双维度分析器"""
@@ -92,21 +101,27 @@ class DualAnalyzer:
             考试表现分析
         """
         total = len(questions)
-        first_correct = sum(1 for q in questions if q.first_attempt.is_correct)
-        first_wrong = total - first_correct
-
-        # 统计订正情况
-        corrected_questions = [q for q in questions if q.correction.has_corrected]
-        corrected_count = len(corrected_questions)
-        correction_success = sum(1 for q in corrected_questions if q.correction.is_correct)
-        correction_failed = corrected_count - correction_success
+        first_correct = 0
+        corrected_count = 0
+        correction_success = 0
+        mistake_dist = defaultdict(int)  # 错题分布
 
-        # 错题分布
-        mistake_dist = defaultdict(int)
+        # 一次遍历同时统计首次答题、订正情况和错题分布
         for q in questions:
-            if not q.first_attempt.is_correct and q.question_type:
+            if q.first_attempt.is_correct:
+                first_correct += 1
+            elif q.question_type:
                 mistake_dist[q.question_type] += 1
 
+            correction = q.correction
+            if correction.has_corrected:
+                corrected_count += 1
+                if correction.is_correct:
+                    correction_success += 1
+
+        first_wrong = total - first_correct
+        correction_failed = corrected_count - correction_success
+
         return ExamPerformance(
             exam_id=exam_id,
             subject=subject,
@@ -139,37 +154,38 @@ class DualAnalyzer:
             知识点状态字典
         """
         # 统计每个知识点的情况
-        kp_stats = defaultdict(lambda: {
-            "total": 0,
-            "first_correct": 0,
-            "has_correction": 0,
-            "correction_correct": 0,
-            "need_practice": False
-        })
+        # 每项为 [总题数, 首次正确数, 订正数, 订正正确数, 是否建议练习]，按位置索引
+        kp_stats: Dict[str, list] = {}
+
+        for q in questions:
+            # 每道题的属性只读一次，供它的所有知识点共用
+            fa = q.first_attempt.is_correct
+            hc = q.correction.has_corrected
+            cc = q.correction.is_correct
+            practice = q.error_analysis.suggest_practice
+
+            for kp in q.knowledge_points:
+                stats = kp_stats.get(kp)
+                if stats is None:
+                    stats = [0, 0, 0, 0, False]
+                    kp_stats[kp] = stats
 
-        for question in questions:
-            for kp in question.knowledge_points:
-                kp_stats[kp]["total"] += 1
+                stats[0] += 1
 
-                if question.first_attempt.is_correct:
-                    kp_stats[kp]["first_correct"] += 1
+                if fa:
+                    stats[1] += 1
 
-                if question.correction.has_corrected:
-                    kp_stats[kp]["has_correction"] += 1
-                    if question.correction.is_correct:
-                        kp_stats[kp]["correction_correct"] += 1
+                if hc:
+                    stats[2] += 1
+                    if cc:
+                        stats[3] += 1
 
-                if question.error_analysis.suggest_practice:
-                    kp_stats[kp]["need_practice"] = True
+                if practice:
+                    stats[4] = True
 
         # 转换为 KnowledgePointStatus 对象
         kp_statuses = {}
-        for kp, stats in kp_stats.items():
-            total = stats["total"]
-            first_correct = stats["first_correct"]
-            correction_correct = stats["correction_correct"]
-            has_correction = stats["has_correction"]
-
+        for kp, (total, first_correct, has_correction, correction_correct, need_practice) in kp_stats.items():
             first_rate = first_correct / total if total > 0 else 0.0
             correction_rate = correction_correct / has_correction if has_correction > 0 else 0.0
 
@@ -188,7 +204,7 @@ class DualAnalyzer:
                 total_questions=total,
                 first_correct_count=first_correct,
                 correction_correct_count=correction_correct,
-                need_practice=stats["need_practice"]
+                need_practice=need_practice
             )
 
         return kp_statuses
@@ -270,6 +286,14 @@ class DualAnalyzer:
 
         return analysis
 
+    @staticmethod
+    def _format_points(points: List[KnowledgePointStatus]) -> str:
+        """将知识点格式化为提示词中的列表行，如 "- 分数（首次40%，订正60%）" """
+        return "\n".join(
+            f"- {kp.knowledge_point}（首次{kp.first_correct_rate:.0%}，订正{kp.correction_correct_rate:.0%}）"
+            for kp in points
+        )
+
     def generate_learning_suggestions(
         self,
         weakness_analysis: WeaknessAnalysis,
@@ -286,15 +310,8 @@ class DualAnalyzer:
             学习建议（Markdown 格式）
         """
         # 构建提示词
-        weak_points_str = "\n".join([
-            f"- {kp.knowledge_point}（首次{kp.first_correct_rate*100:.0f}%，订正{kp.correction_correct_rate*100:.0f}%）"
-            for kp in weakness_analysis.weak_points[:3]  # 最多3个
-        ])
-
-        consolidate_points_str = "\n".join([
-            f"- {kp.knowledge_point}（首次{kp.first_correct_rate*100:.0f}%，订正{kp.correction_correct_rate*100:.0f}%）"
-            for kp in weakness_analysis.consolidate_points[:3]  # 最多3个
-        ])
+        weak_points_str = self._format_points(weakness_analysis.top_weak_points(3))  # 最多3个
+        consolidate_points_str = self._format_points(weakness_analysis.top_consolidate_points(3))  # 最多3个
 
         prompt = f"""请为这个{weakness_analysis.subject}学生生成本周学习建议。
 
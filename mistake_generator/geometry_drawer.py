@@ -2,10 +2,119 @@
 几何图形绘制模块
 自动生成几何题目的图形（SVG格式）
 """
+import io
 import math
+from functools import lru_cache
 from typing import Dict, Any, List, Tuple
 
 
+# 箭头标记定义（固定不变，模块加载时创建一次）
+_ARROW_MARKERS = """  <defs>
+    <marker id="arrowstart" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
+      <polygon points="5,0 10,5 5,10" fill="#666"/>
+    </marker>
+    <marker id="arrowend" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
+      <polygon points="0,5 5,0 5,10" fill="#666"/>
+    </marker>
+  </defs>"""
+
+# 标注中使用箭头的图形类型
+_ARROW_SHAPES = frozenset({"rectangle", "square", "triangle"})
+
+# 各图形的SVG模板（只有坐标和标注数值会变化，其余片段模块加载时拼好）
+# 坐标均为整数像素，用 %d；标注数值可能是小数，用 %s
+# 长方形、正方形、三角形用相对命令的 <path> 描边，输出更短
+# 标注的公共片段：标注线和标注文字各放在一个 <g> 中，描边/字体属性由分组统一设置
+# （文字不能继承描边，所以两类元素分开分组）
+_LINES_OPEN = '    <g stroke="#666" stroke-width="1">\n'
+_TEXTS_OPEN = '    <g font-size="14" fill="#333">\n'
+_GROUP_CLOSE = '    </g>\n'
+_ARROW_LINE = (
+    '      <line x1="%d" y1="%d" x2="%d" y2="%d" '
+    'marker-start="url(#arrowstart)" marker-end="url(#arrowend)"/>\n'
+)
+_DASH_LINE = '      <line x1="%d" y1="%d" x2="%d" y2="%d" stroke-dasharray="5,5"/>\n'
+
+_RECT_TPL = (
+    '  <g class="shape">\n'
+    '    <path d="M%d %dh%dv%dh-%dz" fill="none" stroke="#2196F3" stroke-width="2"/>\n'
+    '%s'
+    '  </g>'
+)
+_RECT_LABELS_TPL = (
+    # 长度标注（上方）、宽度标注（右侧）
+    _LINES_OPEN + _ARROW_LINE + _ARROW_LINE + _GROUP_CLOSE
+    + _TEXTS_OPEN
+    + '      <text x="%d" y="%d" text-anchor="middle">%scm</text>\n'
+    + '      <text x="%d" y="%d">%scm</text>\n'
+    + _GROUP_CLOSE
+)
+
+_SQUARE_TPL = (
+    '  <g class="shape">\n'
+    '    <path d="M%d %dh%dv%dh-%dz" fill="none" stroke="#4CAF50" stroke-width="2"/>\n'
+    '%s'
+    '  </g>'
+)
+_SQUARE_LABELS_TPL = (
+    # 边长标注
+    _LINES_OPEN + _ARROW_LINE + _GROUP_CLOSE
+    + _TEXTS_OPEN
+    + '      <text x="%d" y="%d" text-anchor="middle">%s米</text>\n'
+    + _GROUP_CLOSE
+)
+
+_CIRCLE_TPL = (
+    '  <g class="shape">\n'
+    '    <circle cx="%d" cy="%d" r="%d" \n'
+    '          fill="none" stroke="#FF9800" stroke-width="2"/>\n'
+    '%s'
+    '  </g>'
+)
+_CIRCLE_LABELS_TPL = (
+    # 半径标注
+    _LINES_OPEN + _DASH_LINE + _GROUP_CLOSE
+    + _TEXTS_OPEN
+    + '      <text x="%d" y="%d" text-anchor="middle">r=%scm</text>\n'
+    + _GROUP_CLOSE
+    # 圆心
+    + '    <circle cx="%d" cy="%d" r="3" fill="#666"/>\n'
+)
+
+_TRIANGLE_TPL = (
+    '  <g class="shape">\n'
+    '    <path d="M%d %dh%dl%d %dz" fill="none" stroke="#E91E63" stroke-width="2"/>\n'
+    '%s'
+    '  </g>'
+)
+_TRIANGLE_LABELS_TPL = (
+    # 底边标注、高标注
+    _LINES_OPEN + _ARROW_LINE + _DASH_LINE + _GROUP_CLOSE
+    + _TEXTS_OPEN
+    + '      <text x="%d" y="%d" text-anchor="middle">底=%scm</text>\n'
+    + '      <text x="%d" y="%d">高=%scm</text>\n'
+    + _GROUP_CLOSE
+)
+
+
+@lru_cache(maxsize=32)
+def _grid_svg(width: int, height: int, grid_size: int) -> str:
+    """生成网格的SVG代码（只依赖三个整数，可安全缓存）"""
+    # 垂直线
+    vlines = '\n'.join(
+        '    <line x1="%d" y1="0" x2="%d" y2="%d"/>' % (x, x, height)
+        for x in range(0, width + 1, grid_size)
+    )
+
+    # 水平线
+    hlines = '\n'.join(
+        '    <line x1="0" y1="%d" x2="%d" y2="%d"/>' % (y, width, y)
+        for y in range(0, height + 1, grid_size)
+    )
+
+    return '  <g class="grid" stroke="#f0f0f0" stroke-width="0.5">\n%s\n%s\n  </g>' % (vlines, hlines)
+
+
 class GeometryDrawer:
     """几何图形绘制器"""
 
@@ -41,48 +150,48 @@ class GeometryDrawer:
         Returns:
             SVG代码字符串
         """
-        svg_parts = []
+        buf = io.StringIO()
+        write = buf.write
 
         # SVG头部
-        svg_parts.append(f'<svg width="{width}" height="{height}" xmlns="http://www.w3.org/2000/svg">')
+        write('<svg width="%d" height="%d" xmlns="http://www.w3.org/2000/svg">\n' % (width, height))
 
         # 背景
-        svg_parts.append(f'  <rect width="{width}" height="{height}" fill="white" stroke="#ddd" stroke-width="1"/>')
+        write('  <rect width="%d" height="%d" fill="white" stroke="#ddd" stroke-width="1"/>\n' % (width, height))
+
+        # 箭头定义（只在需要箭头标注时输出一次）
+        if show_labels and shape_type in _ARROW_SHAPES:
+            write(_ARROW_MARKERS)
+            write('\n')
 
         # 网格（可选）
         if show_grid:
-            svg_parts.append(self._draw_grid(width, height))
+            write(self._draw_grid(width, height))
+            write('\n')
 
         # 根据类型绘制图形
+        shape_svg = None
         if shape_type == "rectangle":
-            svg_parts.append(self._draw_rectangle(shape_params, width, height, show_labels))
+            shape_svg = self._draw_rectangle(shape_params, width, height, show_labels)
         elif shape_type == "square":
-            svg_parts.append(self._draw_square(shape_params, width, height, show_labels))
+            shape_svg = self._draw_square(shape_params, width, height, show_labels)
         elif shape_type == "circle":
-            svg_parts.append(self._draw_circle(shape_params, width, height, show_labels))
+            shape_svg = self._draw_circle(shape_params, width, height, show_labels)
         elif shape_type == "triangle":
-            svg_parts.append(self._draw_triangle(shape_params, width, height, show_labels))
+            shape_svg = self._draw_triangle(shape_params, width, height, show_labels)
+
+        if shape_svg is not None:
+            write(shape_svg)
+            write('\n')
 
         # SVG尾部
-        svg_parts.append('</svg>')
+        write('</svg>')
 
-        return '\n'.join(svg_parts)
+        return buf.getvalue()
 
     def _draw_grid(self, width: int, height: int) -> str:
-        """绘制网格"""
-        grid_svg = []
-        grid_svg.append('  <g class="grid" stroke="#f0f0f0" stroke-width="0.5">')
-
-        # 垂直线
-        for x in range(0, width + 1, self.grid_size):
-            grid_svg.append(f'    <line x1="{x}" y1="0" x2="{x}" y2="{height}"/>')
-
-        # 水平线
-        for y in range(0, height + 1, self.grid_size):
-            grid_svg.append(f'    <line x1="0" y1="{y}" x2="{width}" y2="{y}"/>')
-
-        grid_svg.append('  </g>')
-        return '\n'.join(grid_svg)
+        """绘制网格（结果按画布尺寸和网格大小缓存）"""
+        return _grid_svg(width, height, self.grid_size)
 
     def _draw_rectangle(
         self,
@@ -95,42 +204,25 @@ class GeometryDrawer:
         length = params.get('length', params.get('width', 8))
         width = params.get('width', params.get('height', 5))
 
-        # 计算实际像素大小（每个单位用grid_size表示）
-        rect_width = length * self.grid_size
-        rect_height = width * self.grid_size
+        # 计算实际像素大小（每个单位用grid_size表示，取整到像素）
+        rect_width = round(length * self.grid_size)
+        rect_height = round(width * self.grid_size)
 
         # 居中
         x = (canvas_width - rect_width) // 2
         y = (canvas_height - rect_height) // 2
 
-        svg = []
-        svg.append('  <g class="shape">')
-
-        # 长方形
-        svg.append(f'    <rect x="{x}" y="{y}" width="{rect_width}" height="{rect_height}" ')
-        svg.append('          fill="none" stroke="#2196F3" stroke-width="2"/>')
-
         # 标注
+        labels = ''
         if show_labels:
-            # 长度标注（上方）
-            svg.append(f'    <line x1="{x}" y1="{y-10}" x2="{x+rect_width}" y2="{y-10}" ')
-            svg.append('          stroke="#666" stroke-width="1" marker-start="url(#arrowstart)" marker-end="url(#arrowend)"/>')
-            svg.append(f'    <text x="{x+rect_width//2}" y="{y-15}" text-anchor="middle" ')
-            svg.append(f'          font-size="14" fill="#333">{length}cm</text>')
-
-            # 宽度标注（右侧）
-            svg.append(f'    <line x1="{x+rect_width+10}" y1="{y}" x2="{x+rect_width+10}" y2="{y+rect_height}" ')
-            svg.append('          stroke="#666" stroke-width="1" marker-start="url(#arrowstart)" marker-end="url(#arrowend)"/>')
-            svg.append(f'    <text x="{x+rect_width+15}" y="{y+rect_height//2}" ')
-            svg.append(f'          font-size="14" fill="#333">{width}cm</text>')
+            labels = _RECT_LABELS_TPL % (
+                x, y - 10, x + rect_width, y - 10,
+                x + rect_width + 10, y, x + rect_width + 10, y + rect_height,
+                x + rect_width // 2, y - 15, length,
+                x + rect_width + 15, y + rect_height // 2, width,
+            )
 
-        svg.append('  </g>')
-
-        # 添加箭头定义
-        if show_labels:
-            svg.insert(0, self._get_arrow_markers())
-
-        return '\n'.join(svg)
+        return _RECT_TPL % (x, y, rect_width, rect_height, rect_width, labels)
 
     def _draw_square(
         self,
@@ -143,33 +235,21 @@ class GeometryDrawer:
         side = params.get('side', 6)
 
         # 计算实际像素大小
-        square_size = side * self.grid_size
+        square_size = round(side * self.grid_size)
 
         # 居中
         x = (canvas_width - square_size) // 2
         y = (canvas_height - square_size) // 2
 
-        svg = []
-        svg.append('  <g class="shape">')
-
-        # 正方形
-        svg.append(f'    <rect x="{x}" y="{y}" width="{square_size}" height="{square_size}" ')
-        svg.append('          fill="none" stroke="#4CAF50" stroke-width="2"/>')
-
         # 标注
+        labels = ''
         if show_labels:
-            # 边长标注
-            svg.append(f'    <line x1="{x}" y1="{y-10}" x2="{x+square_size}" y2="{y-10}" ')
-            svg.append('          stroke="#666" stroke-width="1" marker-start="url(#arrowstart)" marker-end="url(#arrowend)"/>')
-            svg.append(f'    <text x="{x+square_size//2}" y="{y-15}" text-anchor="middle" ')
-            svg.append(f'          font-size="14" fill="#333">{side}米</text>')
+            labels = _SQUARE_LABELS_TPL % (
+                x, y - 10, x + square_size, y - 10,
+                x + square_size // 2, y - 15, side,
+            )
 
-        svg.append('  </g>')
-
-        if show_labels:
-            svg.insert(0, self._get_arrow_markers())
-
-        return '\n'.join(svg)
+        return _SQUARE_TPL % (x, y, square_size, square_size, square_size, labels)
 
     def _draw_circle(
         self,
@@ -182,33 +262,22 @@ class GeometryDrawer:
         radius = params.get('radius', 4)
 
         # 计算实际像素大小
-        r = radius * self.grid_size
+        r = round(radius * self.grid_size)
 
         # 居中
         cx = canvas_width // 2
         cy = canvas_height // 2
 
-        svg = []
-        svg.append('  <g class="shape">')
-
-        # 圆形
-        svg.append(f'    <circle cx="{cx}" cy="{cy}" r="{r}" ')
-        svg.append('          fill="none" stroke="#FF9800" stroke-width="2"/>')
-
         # 标注
+        labels = ''
         if show_labels:
-            # 半径标注
-            svg.append(f'    <line x1="{cx}" y1="{cy}" x2="{cx+r}" y2="{cy}" ')
-            svg.append('          stroke="#666" stroke-width="1" stroke-dasharray="5,5"/>')
-            svg.append(f'    <text x="{cx+r//2}" y="{cy-5}" text-anchor="middle" ')
-            svg.append(f'          font-size="14" fill="#333">r={radius}cm</text>')
-
-            # 圆心
-            svg.append(f'    <circle cx="{cx}" cy="{cy}" r="3" fill="#666"/>')
+            labels = _CIRCLE_LABELS_TPL % (
+                cx, cy, cx + r, cy,
+                cx + r // 2, cy - 5, radius,
+                cx, cy,
+            )
 
-        svg.append('  </g>')
-
-        return '\n'.join(svg)
+        return _CIRCLE_TPL % (cx, cy, r, labels)
 
     def _draw_triangle(
         self,
@@ -222,55 +291,27 @@ class GeometryDrawer:
         height = params.get('height', 6)
 
         # 计算实际像素大小
-        base_px = base * self.grid_size
-        height_px = height * self.grid_size
+        base_px = round(base * self.grid_size)
+        height_px = round(height * self.grid_size)
 
         # 居中
         x1 = (canvas_width - base_px) // 2
         y1 = (canvas_height + height_px) // 2
         x2 = x1 + base_px
-        y2 = y1
         x3 = (x1 + x2) // 2
         y3 = y1 - height_px
 
-        svg = []
-        svg.append('  <g class="shape">')
-
-        # 三角形
-        svg.append(f'    <polygon points="{x1},{y1} {x2},{y2} {x3},{y3}" ')
-        svg.append('          fill="none" stroke="#E91E63" stroke-width="2"/>')
-
         # 标注
+        labels = ''
         if show_labels:
-            # 底边标注
-            svg.append(f'    <line x1="{x1}" y1="{y1+10}" x2="{x2}" y2="{y1+10}" ')
-            svg.append('          stroke="#666" stroke-width="1" marker-start="url(#arrowstart)" marker-end="url(#arrowend)"/>')
-            svg.append(f'    <text x="{(x1+x2)//2}" y="{y1+25}" text-anchor="middle" ')
-            svg.append(f'          font-size="14" fill="#333">底={base}cm</text>')
-
-            # 高标注
-            svg.append(f'    <line x1="{x3}" y1="{y3}" x2="{x3}" y2="{y1}" ')
-            svg.append('          stroke="#666" stroke-width="1" stroke-dasharray="5,5"/>')
-            svg.append(f'    <text x="{x3+20}" y="{(y3+y1)//2}" ')
-            svg.append(f'          font-size="14" fill="#333">高={height}cm</text>')
-
-        svg.append('  </g>')
-
-        if show_labels:
-            svg.insert(0, self._get_arrow_markers())
-
-        return '\n'.join(svg)
-
-    def _get_arrow_markers(self) -> str:
-        """获取箭头标记定义"""
-        return """  <defs>
-    <marker id="arrowstart" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
-      <polygon points="5,0 10,5 5,10" fill="#666"/>
-    </marker>
-    <marker id="arrowend" markerWidth="10" markerHeight="10" refX="5" refY="5" orient="auto">
-      <polygon points="0,5 5,0 5,10" fill="#666"/>
-    </marker>
-  </defs>"""
+            labels = _TRIANGLE_LABELS_TPL % (
+                x1, y1 + 10, x2, y1 + 10,
+                x3, y3, x3, y1,
+                (x1 + x2) // 2, y1 + 25, base,
+                x3 + 20, (y3 + y1) // 2, height,
+            )
+
+        return _TRIANGLE_TPL % (x1, y1, base_px, x3 - x2, -height_px, labels)
 
 
 if __name__ == "__main__":
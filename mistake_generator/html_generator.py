@@ -7,9 +7,54 @@ from typing import Dict, List, Any
 from datetime import datetime
 
 
+# 题目和答案的HTML模板（每个片段后面的空行与逐行写入时的输出保持一致）
+_ORIGINAL_TAG = ' <span class="original-tag">[原题]</span>'
+
+_QUESTION_TYPE_TPL = (
+    '    <div class="question-type">\n\n'
+    '        <h2>%s</h2>\n'
+)
+
+_QUESTION_TPL = (
+    '        <div class="question">\n\n'
+    '            <div class="question-number">%d.%s</div>\n\n'
+    '            <div class="question-content">%s</div>\n\n'
+    '            <div class="answer-area"></div>\n\n'
+    '        </div>\n'
+)
+
+_ANSWERS_HEADER = (
+    '    <div class="page-break"></div>\n\n'
+    '    <div class="answers-section">\n\n'
+    '        <h1>参考答案</h1>\n\n'
+    '        <hr class="divider">\n'
+)
+
+_ANSWER_TYPE_TPL = (
+    '        <div class="answer-type">\n\n'
+    '            <h2>%s</h2>\n'
+)
+
+_ANSWER_TPL = (
+    '            <div class="answer-item">\n\n'
+    '                <span class="answer-number">%d.</span>\n\n'
+    '                <span class="answer-content">%s</span>\n\n'
+    '            </div>\n'
+)
+
+
 class HTMLGenerator:
     """HTML生成器"""
 
+    # HTML特殊字符转义表，类定义时构建一次
+    _ESCAPE_TABLE = str.maketrans({
+        '&': '&amp;',
+        '<': '&lt;',
+        '>': '&gt;',
+        '"': '&quot;',
+        "'": '&#39;',
+    })
+
     def __init__(self, output_dir: Path):
         """
         初始化HTML生成器
@@ -37,9 +82,12 @@ class HTMLGenerator:
         Returns:
             生成的HTML文件路径
         """
+        # 文件名和页眉共用同一个时间
+        now = datetime.now()
+
         # 生成文件名
         if not output_filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             output_filename = f"错题练习_{timestamp}.html"
 
         if not output_filename.endswith('.html'):
@@ -49,106 +97,87 @@ class HTMLGenerator:
 
         print(f"\n正在生成HTML: {output_filename}...", flush=True)
 
-        # 构建HTML内容
-        html_parts = []
-
-        # HTML头部
-        html_parts.append(self._generate_header())
-
-        # 标题和信息
-        html_parts.append(f"""
-    <div class="header">
-        <h1>错题练习卷</h1>
-        <div class="info">
-            <span>生成时间：{datetime.now().strftime("%Y年%m月%d日")}</span>
-            <span>姓名：__________</span>
-            <span>用时：____分钟</span>
-        </div>
-    </div>
-    <hr class="divider">
-""")
-
-        # 按题型添加题目
+        # 先遍历一遍题集，收集题目和答案（转义在写入前按题型批量进行）
+        groups = []  # [(题型, [(题号, 原题标签, 题目内容)])]
+        all_answers = []  # [(题号, 答案, 题型)]
         question_counter = 1
-        all_answers = []
 
         for q_type, sections in practice_set.items():
             if not sections:
                 continue
 
-            html_parts.append(f'    <div class="question-type">\n')
-            html_parts.append(f'        <h2>{q_type}</h2>\n')
-
+            records = []
             for section in sections:
                 # 原题
-                if section.get("original_question"):
-                    original = section["original_question"]
-                    html_parts.append(f'        <div class="question">\n')
-                    html_parts.append(f'            <div class="question-number">{question_counter}. <span class="original-tag">[原题]</span></div>\n')
-                    html_parts.append(f'            <div class="question-content">{self._escape_html(original["question_content"])}</div>\n')
-                    html_parts.append(f'            <div class="answer-area"></div>\n')
-                    html_parts.append(f'        </div>\n')
-
+                original = section.get("original_question")
+                if original:
+                    records.append((question_counter, _ORIGINAL_TAG, original["question_content"]))
                     if include_answers and original.get("correct_answer"):
-                        all_answers.append({
-                            "number": question_counter,
-                            "answer": original["correct_answer"],
-                            "type": q_type
-                        })
-
+                        all_answers.append((question_counter, original["correct_answer"], q_type))
                     question_counter += 1
 
                 # 相似题
                 for similar_q in section.get("similar_questions", []):
-                    html_parts.append(f'        <div class="question">\n')
-                    html_parts.append(f'            <div class="question-number">{question_counter}.</div>\n')
-                    html_parts.append(f'            <div class="question-content">{self._escape_html(similar_q["question_content"])}</div>\n')
-                    html_parts.append(f'            <div class="answer-area"></div>\n')
-                    html_parts.append(f'        </div>\n')
-
+                    records.append((question_counter, '', similar_q["question_content"]))
                     if include_answers and similar_q.get("correct_answer"):
-                        all_answers.append({
-                            "number": question_counter,
-                            "answer": similar_q["correct_answer"],
-                            "type": q_type
-                        })
-
+                        all_answers.append((question_counter, similar_q["correct_answer"], q_type))
                     question_counter += 1
 
-            html_parts.append(f'    </div>\n')
+            groups.append((q_type, records))
 
-        # 答案页
-        if include_answers and all_answers:
-            html_parts.append(f'    <div class="page-break"></div>\n')
-            html_parts.append(f'    <div class="answers-section">\n')
-            html_parts.append(f'        <h1>参考答案</h1>\n')
-            html_parts.append(f'        <hr class="divider">\n')
+        # 边生成边写入文件（大缓冲区，不在内存中保留整份HTML；换行不做平台转换）
+        with open(output_path, 'w', encoding='utf-8', buffering=1 << 20, newline='\n') as f:
+            def emit(part: str) -> None:
+                """写入一个HTML片段（片段之间以换行分隔）"""
+                f.write(part)
+                f.write('\n')
 
-            current_type = None
-            for ans in all_answers:
-                if ans["type"] != current_type:
-                    if current_type is not None:
-                        html_parts.append(f'        </div>\n')
-                    current_type = ans["type"]
-                    html_parts.append(f'        <div class="answer-type">\n')
-                    html_parts.append(f'            <h2>{current_type}</h2>\n')
+            # HTML头部
+            emit(self._generate_header())
 
-                html_parts.append(f'            <div class="answer-item">\n')
-                html_parts.append(f'                <span class="answer-number">{ans["number"]}.</span>\n')
-                html_parts.append(f'                <span class="answer-content">{self._escape_html(ans["answer"])}</span>\n')
-                html_parts.append(f'            </div>\n')
+            # 标题和信息
+            emit(f"""
+    <div class="header">
+        <h1>错题练习卷</h1>
+        <div class="info">
+            <span>生成时间：{now.strftime("%Y年%m月%d日")}</span>
+            <span>姓名：__________</span>
+            <span>用时：____分钟</span>
+        </div>
+    </div>
+    <hr class="divider">
+""")
 
-            if current_type is not None:
-                html_parts.append(f'        </div>\n')
+            # 按题型添加题目
+            for q_type, records in groups:
+                emit(_QUESTION_TYPE_TPL % q_type)
+                contents = self._escape_many([content for _, _, content in records])
+                for (number, tag, _), content in zip(records, contents):
+                    emit(_QUESTION_TPL % (number, tag, content))
+                emit('    </div>\n')
 
-            html_parts.append(f'    </div>\n')
+            # 答案页
+            if include_answers and all_answers:
+                emit(_ANSWERS_HEADER)
 
-        # HTML尾部
-        html_parts.append(self._generate_footer())
+                current_type = None
+                answers = self._escape_many([answer for _, answer, _ in all_answers])
+                for (number, _, a_type), answer in zip(all_answers, answers):
+                    if a_type != current_type:
+                        if current_type is not None:
+                            emit('        </div>\n')
+                        current_type = a_type
+                        emit(_ANSWER_TYPE_TPL % current_type)
 
-        # 写入文件
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(html_parts))
+                    emit(_ANSWER_TPL % (number, answer))
+
+                if current_type is not None:
+                    emit('        </div>\n')
+
+                emit('    </div>\n')
+
+            # HTML尾部
+            f.write(self._generate_footer())
 
         print(f"HTML生成成功: {output_path}", flush=True)
         print(f"  共 {question_counter - 1} 道题目", flush=True)
@@ -158,16 +187,16 @@ class HTMLGenerator:
 
         return output_path
 
+    def _escape_many(self, texts: List[str]) -> List[str]:
+        """批量转义HTML特殊字符"""
+        table = self._ESCAPE_TABLE
+        return [text.translate(table) if text else "" for text in texts]
+
     def _escape_html(self, text: str) -> str:
-        """转义HTML特殊字符"""
+        """转义HTML特殊字符（单次扫描完成全部替换）"""
         if not text:
             return ""
-        return (text
-                .replace('&', '&amp;')
-                .replace('<', '&lt;')
-                .replace('>', '&gt;')
-                .replace('"', '&quot;')
-                .replace("'", '&#39;'))
+        return text.translate(self._ESCAPE_TABLE)
 
     def _generate_header(self) -> str:
         """生成HTML头部"""
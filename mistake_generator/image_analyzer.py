@@ -3,60 +3,34 @@
 使用 Claude Vision API 识别图片中的题目和错题标记
 """
 import base64
-import json
+import io
+import os
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Any
-from anthropic import Anthropic
-from .config import ANTHROPIC_API_KEY, CLAUDE_MODEL, QUESTION_TYPES
+from typing import Callable, List, Dict, Any, Optional
+from PIL import Image, ImageOps
+from .ai_provider import (
+    extract_json_text, file_digest, loads_json, new_http_client, read_json_file, write_json_atomic
+)
+from .config import ANTHROPIC_API_KEY, ANALYSIS_CACHE_DIR, CLAUDE_MODEL, QUESTION_TYPES
 
 
-class ImageAnalyzer:
-    """图像分析器，用于识别试卷图片中的题目"""
-
-    def __init__(self, api_key: str = None):
-        """
-        初始化图像分析器
-
-        Args:
-            api_key: Anthropic API密钥，如果不提供则从配置中读取
-        """
-        self.api_key = api_key or ANTHROPIC_API_KEY
-        if not self.api_key:
-            raise ValueError("未找到 ANTHROPIC_API_KEY，请在 .env 文件中配置")
-        self.client = Anthropic(api_key=self.api_key)
-
-    def encode_image(self, image_path: Path) -> str:
-        """
-        将图片编码为base64
-
-        Args:
-            image_path: 图片路径
-
-        Returns:
-            base64编码的图片字符串
-        """
-        with open(image_path, "rb") as image_file:
-            return base64.standard_b64encode(image_file.read()).decode("utf-8")
-
-    def analyze_image(self, image_path: Path) -> Dict[str, Any]:
-        """
-        分析单张图片，识别其中的题目
+# 上传前缩放到的最长边（像素）和 JPEG 压缩质量
+# Vision API 内部也会缩放到这个尺寸左右，手机拍的大图直接上传只会浪费带宽
+_MAX_IMAGE_SIDE = 1568
+_JPEG_QUALITY = 85
 
-        Args:
-            image_path: 图片路径
-
-        Returns:
-            包含题目信息的字典
-        """
-        print(f"正在分析图片: {image_path.name}...", flush=True)
+# 支持的图片扩展名（小写）
+_IMAGE_SUFFIXES = frozenset({".jpg", ".jpeg", ".png"})
 
-        # 读取并编码图片
-        image_data = self.encode_image(image_path)
-        print("  图片已加载，正在调用API识别...", flush=True)
+# 并发调用 Vision API 的默认线程数（请求以网络等待为主，线程即可并行）
+DEFAULT_MAX_WORKERS = 8
 
-        # 构建提示词
-        prompt = f"""请仔细分析这张三年级数学试卷图片，提取所有题目信息。
+# 识别试卷题目的提示词（题目类型来自配置，模块加载时生成一次）
+_ANALYSIS_PROMPT = f"""请仔细分析这张三年级数学试卷图片，提取所有题目信息。
 
 要求：
 1. 识别图片中的所有题目（包括题号、题目内容、学生的答案）
@@ -91,8 +65,117 @@ class ImageAnalyzer:
 - 如果无法确定某些字段，可以设为null
 - 请确保返回的是有效的JSON格式"""
 
-        # 调用Claude API
+# 单次 API 请求的超时时间（秒）
+_API_TIMEOUT = 60.0
+
+
+@lru_cache(maxsize=None)
+def _get_client(api_key: str):
+    """获取进程内共享的 Anthropic 客户端（同一密钥只创建一次，各线程共用连接池）"""
+    # 延迟导入 SDK：只生成数学题等不用 AI 的场景无需加载 anthropic/httpx
+    from anthropic import Anthropic
+
+    return Anthropic(api_key=api_key, http_client=new_http_client(), timeout=_API_TIMEOUT)
+
+
+class ImageAnalyzer:
+    """图像分析器，用于识别试卷图片中的题目"""
+
+    # 多线程分析时各图片的日志整块输出，避免各线程的打印交错
+    _print_lock = threading.Lock()
+
+    def __init__(self, api_key: str = None, cache_dir: Optional[Path] = ANALYSIS_CACHE_DIR):
+        """
+        初始化图像分析器
+
+        Args:
+            api_key: Anthropic API密钥，如果不提供则从配置中读取
+            cache_dir: 识别结果缓存目录，为 None 时不使用缓存
+        """
+        self.api_key = api_key or ANTHROPIC_API_KEY
+        if not self.api_key:
+            raise ValueError("未找到 ANTHROPIC_API_KEY，请在 .env 文件中配置")
+        self.client = _get_client(self.api_key)
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def _prepare_image(image_path: Path) -> bytes:
+        """
+        缩放并压缩图片，用于上传
+
+        Args:
+            image_path: 图片路径
+
+        Returns:
+            最长边不超过 _MAX_IMAGE_SIDE 的 JPEG 图片数据
+        """
+        with Image.open(image_path) as img:
+            # 按 EXIF 方向信息摆正（重新编码后 EXIF 不再保留）
+            img = ImageOps.exif_transpose(img)
+            img.thumbnail((_MAX_IMAGE_SIDE, _MAX_IMAGE_SIDE))
+            buf = io.BytesIO()
+            img.convert("RGB").save(buf, "JPEG", quality=_JPEG_QUALITY, optimize=True)
+        return buf.getvalue()
+
+    def _load_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的识别结果，不存在或已损坏时返回 None"""
+        return read_json_file(self.cache_dir / f"{cache_key}.json")
+
+    def _save_cached(self, cache_key: str, result: Dict[str, Any], log: Callable[[str], None]) -> None:
+        """写入识别结果缓存"""
+        try:
+            write_json_atomic(self.cache_dir / f"{cache_key}.json", result)
+        except OSError as e:
+            log(f"  警告: 写入缓存失败: {e}")
+
+    @staticmethod
+    def _print_summary(result: Dict[str, Any], log: Callable[[str], None]) -> None:
+        """输出识别到的题目数和错题数"""
+        log(f"  ✓ 识别到 {len(result.get('questions', []))} 道题目")
+        mistakes = sum(1 for q in result.get('questions', []) if q.get('is_mistake', False))
+        log(f"  ✓ 其中错题 {mistakes} 道")
+
+    @staticmethod
+    def _print_line(line: str) -> None:
+        """直接打印一行进度信息"""
+        print(line, flush=True)
+
+    def analyze_image(self, image_path: Path, log: Optional[Callable[[str], None]] = None) -> Dict[str, Any]:
+        """
+        分析单张图片，识别其中的题目
+
+        Args:
+            image_path: 图片路径
+            log: 接收每行进度信息的函数，默认直接打印
+
+        Returns:
+            包含题目信息的字典
+        """
+        log = log or self._print_line
+        log(f"正在分析图片: {image_path.name}...")
+
+        # 同一张图片（且模型和提示词未变）已识别过时直接使用缓存结果
+        cache_key = None
+        if self.cache_dir is not None:
+            try:
+                cache_key = file_digest(image_path, f"{CLAUDE_MODEL}\n{_ANALYSIS_PROMPT}")
+            except OSError:
+                # 文件无法读取，下面读取图片时会返回错误结果
+                cache_key = None
+            cached = self._load_cached(cache_key) if cache_key is not None else None
+            if cached is not None:
+                cached["image_path"] = str(image_path)
+                log("  ✓ 使用缓存的识别结果")
+                self._print_summary(cached, log)
+                return cached
+
         try:
+            # 读取、缩放并编码图片（统一转为 JPEG 上传）
+            # Pillow 无法解码的图片（损坏、HEIC 等）与 API 错误一样返回错误结果，不影响其他图片
+            image_data = base64.standard_b64encode(self._prepare_image(image_path)).decode("ascii")
+            log("  图片已加载，正在调用API识别...")
+
+            # 调用Claude API
             message = self.client.messages.create(
                 model=CLAUDE_MODEL,
                 max_tokens=4096,
@@ -110,7 +193,7 @@ class ImageAnalyzer:
                             },
                             {
                                 "type": "text",
-                                "text": prompt
+                                "text": _ANALYSIS_PROMPT
                             }
                         ],
                     }
@@ -121,31 +204,22 @@ class ImageAnalyzer:
             response_text = message.content[0].text
 
             # 尝试从响应中提取JSON
-            # Claude 可能会在JSON前后添加一些说明文字，需要提取出JSON部分
-            response_text = response_text.strip()
-
-            # 如果响应包含markdown代码块，提取其中的内容
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + 3
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-
-            # 解析JSON
-            result = json.loads(response_text)
+            # Claude 可能会在JSON前后添加一些说明文字或markdown代码块，需要提取出JSON部分
+            response_text = extract_json_text(response_text)
+
+            # 解析JSON（安装了 orjson 时使用 orjson）
+            result = loads_json(response_text)
             result["image_path"] = str(image_path)
 
-            print(f"  ✓ 识别到 {len(result.get('questions', []))} 道题目", flush=True)
-            mistakes = sum(1 for q in result.get('questions', []) if q.get('is_mistake', False))
-            print(f"  ✓ 其中错题 {mistakes} 道", flush=True)
+            if cache_key is not None:
+                self._save_cached(cache_key, result, log)
+
+            self._print_summary(result, log)
 
             return result
 
         except Exception as e:
-            print(f"  ✗ 分析失败: {str(e)}", flush=True)
+            log(f"  ✗ 分析失败: {str(e)}")
             return {
                 "image_path": str(image_path),
                 "error": str(e),
@@ -153,35 +227,45 @@ class ImageAnalyzer:
                 "questions": []
             }
 
-    def analyze_all_images(self, image_dir: Path) -> List[Dict[str, Any]]:
+    def analyze_all_images(self, image_dir: Path, max_workers: int = DEFAULT_MAX_WORKERS) -> List[Dict[str, Any]]:
         """
-        分析目录中的所有图片
+        分析目录中的所有图片（多张图片并发调用API）
 
         Args:
             image_dir: 图片目录路径
+            max_workers: 并发线程数，为 1 时逐张顺序分析
 
         Returns:
-            所有图片的分析结果列表
+            所有图片的分析结果列表（与图片文件顺序一致）
         """
-        # 获取所有图片文件
-        image_files = sorted(
-            [f for f in image_dir.glob("*.jpg") if f.is_file()] +
-            [f for f in image_dir.glob("*.jpeg") if f.is_file()] +
-            [f for f in image_dir.glob("*.png") if f.is_file()]
-        )
+        # 获取所有图片文件（单次扫描目录，扩展名不区分大小写）
+        with os.scandir(image_dir) as entries:
+            image_files = sorted(
+                Path(entry.path) for entry in entries
+                if entry.is_file() and os.path.splitext(entry.name)[1].lower() in _IMAGE_SUFFIXES
+            )
 
         if not image_files:
             print(f"在 {image_dir} 中未找到图片文件", flush=True)
             return []
 
-        print(f"\n找到 {len(image_files)} 张图片，开始分析...", flush=True)
+        total = len(image_files)
+        print(f"\n找到 {total} 张图片，开始分析...", flush=True)
         print("=" * 60, flush=True)
 
-        results = []
-        for idx, image_path in enumerate(image_files, 1):
-            print(f"\n[{idx}/{len(image_files)}] ", end="", flush=True)
-            result = self.analyze_image(image_path)
-            results.append(result)
+        def analyze(idx: int, image_path: Path) -> Dict[str, Any]:
+            # 先收集这张图片的全部日志，分析完成后加锁整块输出
+            lines: List[str] = []
+            result = self.analyze_image(image_path, log=lines.append)
+            lines[0] = f"\n[{idx}/{total}] {lines[0]}"
+            with self._print_lock:
+                print("\n".join(lines), flush=True)
+            return result
+
+        # executor.map 按提交顺序返回结果
+        workers = max(1, min(max_workers, total))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(analyze, range(1, total + 1), image_files))
 
         print("\n" + "=" * 60, flush=True)
         print(f"分析完成！共处理 {len(results)} 张图片", flush=True)
@@ -2,6 +2,14 @@
 小学数学知识点体系
 适用于三年级上下学期
 """
+import re
+from functools import lru_cache
+
+try:
+    import ahocorasick
+except ImportError:  # pyahocorasick 为可选依赖，未安装时用正则一次扫描
+    ahocorasick = None
+
 
 # 三年级数学知识点体系
 KNOWLEDGE_POINTS = {
@@ -169,18 +177,130 @@ KNOWLEDGE_POINTS = {
 
 
 def get_all_knowledge_points():
-    """获取所有知识点的扁平列表"""
-    all_points = []
+    """获取所有知识点的扁平列表（模块加载时构建，返回共享列表，调用方不要修改）"""
+    return _ALL_POINTS
+
+
+def iter_points():
+    """按体系顺序遍历所有知识点的 (名称, 类别)"""
+    return zip(_NAMES, _CATEGORIES)
+
+
+def _build_indexes():
+    """
+    遍历一次知识点体系，构建扁平索引（模块加载时执行一次）
+
+    Returns:
+        (关键词 -> 知识点名称列表, 知识点名称 -> 知识点详细信息)
+    """
+    keyword_to_points = {}  # 同一关键词可能属于多个知识点
+    point_index = {}
     for category, category_data in KNOWLEDGE_POINTS.items():
         for point_name, point_data in category_data["sub_points"].items():
-            all_points.append({
-                "category": category,
-                "name": point_name,
-                "description": point_data["description"],
-                "difficulty": point_data["difficulty"],
-                "keywords": point_data["keywords"]
-            })
-    return all_points
+            info = point_data.copy()
+            info["category"] = category
+            info["name"] = point_name
+            point_index[point_name] = info
+            for keyword in point_data["keywords"]:
+                keyword_to_points.setdefault(keyword, []).append(point_name)
+    return keyword_to_points, point_index
+
+
+def _build_keyword_automaton():
+    """把所有关键词构建成一个 Aho-Corasick 自动机，未安装 pyahocorasick 时返回 None"""
+    if ahocorasick is None:
+        return None
+
+    automaton = ahocorasick.Automaton()
+    for keyword, orders in _KEYWORD_TO_ORDERS.items():
+        automaton.add_word(keyword, orders)
+    automaton.make_automaton()
+    return automaton
+
+
+_KEYWORD_TO_POINTS, _POINT_INDEX = _build_indexes()
+
+# 知识点名称 -> 在体系中的序号（匹配结果按此顺序排列）
+_POINT_ORDER = {point_name: order for order, point_name in enumerate(_POINT_INDEX)}
+
+# 按列存储的知识点（第 i 个知识点由各元组的第 i 项组成）
+_NAMES = tuple(_POINT_INDEX)
+_CATEGORIES = tuple(info["category"] for info in _POINT_INDEX.values())
+_DESCRIPTIONS = tuple(info["description"] for info in _POINT_INDEX.values())
+_DIFFICULTIES = tuple(info["difficulty"] for info in _POINT_INDEX.values())
+_KEYWORDS = tuple(tuple(info["keywords"]) for info in _POINT_INDEX.values())
+
+_ALL_POINTS = [
+    {
+        "category": category,
+        "name": name,
+        "description": description,
+        "difficulty": difficulty,
+        "keywords": list(keywords)
+    }
+    for name, category, description, difficulty, keywords
+    in zip(_NAMES, _CATEGORIES, _DESCRIPTIONS, _DIFFICULTIES, _KEYWORDS)
+]
+
+# 关键词 -> 知识点序号（匹配时收集整数序号，排序后再换成名称，无需逐个查名称的顺序）
+_KEYWORD_TO_ORDERS = {
+    keyword: tuple(_POINT_ORDER[point_name] for point_name in point_names)
+    for keyword, point_names in _KEYWORD_TO_POINTS.items()
+}
+
+_KEYWORD_AUTOMATON = _build_keyword_automaton()
+
+
+def _build_keyword_regex():
+    """
+    把所有关键词编译成一个正则（未安装 pyahocorasick 时使用）
+
+    零宽先行断言让每个位置都尝试匹配，长关键词排在前面，
+    因此每个位置匹配到的是最长的关键词；同一位置上更短的关键词
+    一定包含在这个最长关键词里，通过包含关系补齐。
+
+    Returns:
+        (编译后的正则, 匹配到的关键词 -> 它及其包含的所有关键词对应的知识点序号)
+    """
+    keywords = sorted(_KEYWORD_TO_POINTS, key=len, reverse=True)
+    pattern = re.compile("(?=(%s))" % "|".join(map(re.escape, keywords)))
+    hit_orders = {
+        keyword: tuple(dict.fromkeys(
+            order
+            for other, orders in _KEYWORD_TO_ORDERS.items()
+            if other in keyword
+            for order in orders
+        ))
+        for keyword in keywords
+    }
+    return pattern, hit_orders
+
+
+_KEYWORD_RE, _KEYWORD_HIT_ORDERS = _build_keyword_regex()
+
+# 所有关键词的首字符：题目与它没有交集时不可能匹配到任何关键词
+_KEYWORD_FIRST_CHARS = frozenset(keyword[0] for keyword in _KEYWORD_TO_POINTS)
+
+
+@lru_cache(maxsize=4096)
+def _match_keywords(question_content):
+    """按关键词匹配知识点（结果按题目内容缓存，返回不可变的元组）"""
+    # 先按首字符快速排除明显不可能匹配的题目
+    if _KEYWORD_FIRST_CHARS.isdisjoint(question_content):
+        return ("未分类",)
+
+    # 有自动机时用自动机，否则用正则，都只扫描一遍题目
+    matched_orders = set()
+    if _KEYWORD_AUTOMATON is not None:
+        for _, orders in _KEYWORD_AUTOMATON.iter(question_content):
+            matched_orders.update(orders)
+    else:
+        for keyword in set(_KEYWORD_RE.findall(question_content)):
+            matched_orders.update(_KEYWORD_HIT_ORDERS[keyword])
+
+    if not matched_orders:
+        return ("未分类",)
+    return tuple(_NAMES[order] for order in sorted(matched_orders))
 
 
 def match_knowledge_points(question_content, existing_points=None):
@@ -194,34 +314,37 @@ def match_knowledge_points(question_content, existing_points=None):
     Returns:
         匹配到的知识点列表
     """
-    matched_points = []
-
     # 如果已经有知识点，先使用已有的
     if existing_points:
         return existing_points
 
-    # 否则根据关键词匹配
-    for category, category_data in KNOWLEDGE_POINTS.items():
-        for point_name, point_data in category_data["sub_points"].items():
-            # 检查关键词是否在题目中
-            for keyword in point_data["keywords"]:
-                if keyword in question_content:
-                    if point_name not in matched_points:
-                        matched_points.append(point_name)
-                    break
+    # 否则根据关键词匹配（同样的题目内容直接复用缓存结果）
+    return list(_match_keywords(question_content))
 
-    return matched_points if matched_points else ["未分类"]
+
+def match_knowledge_points_batch(question_contents, existing_points_list=None):
+    """
+    批量匹配多道题目的知识点
+
+    Args:
+        question_contents: 题目内容列表
+        existing_points_list: 与题目一一对应的已有知识点列表（可选）
+
+    Returns:
+        与题目一一对应的知识点列表
+    """
+    if existing_points_list is None:
+        return [list(_match_keywords(content)) for content in question_contents]
+    return [
+        existing_points or list(_match_keywords(content))
+        for content, existing_points in zip(question_contents, existing_points_list)
+    ]
 
 
 def get_knowledge_point_info(point_name):
     """获取知识点详细信息"""
-    for category, category_data in KNOWLEDGE_POINTS.items():
-        if point_name in category_data["sub_points"]:
-            info = category_data["sub_points"][point_name].copy()
-            info["category"] = category
-            info["name"] = point_name
-            return info
-    return None
+    info = _POINT_INDEX.get(point_name)
+    return info.copy() if info is not None else None
 
 
 if __name__ == "__main__":
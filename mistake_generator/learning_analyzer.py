@@ -3,12 +3,27 @@
 智能分析学生的学习情况并给出建议
 """
 import os
+from bisect import bisect_right
+from concurrent.futures import ThreadPoolExecutor
+from operator import itemgetter
 from typing import Dict, List, Any
 from anthropic import Anthropic
 from .knowledge_points import KNOWLEDGE_POINTS, get_knowledge_point_info
 from .student_profile import StudentProfile
 
 
+# AI 分析以网络等待为主，放到后台线程执行，与本地统计计算重叠
+# （线程在第一次提交任务时才创建）
+_AI_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="ai-insights")
+
+# 掌握程度的正确率分界线及对应的评价（分界值归入较高一档）
+_STATUS_THRESHOLDS = (60, 75, 90)
+_STATUS_LABELS = ("需加强", "一般", "良好", "优秀")
+
+# 题型分析按正确率排序的键
+_BY_ACCURACY = itemgetter("accuracy_rate")
+
+
 class LearningAnalyzer:
     """学习分析器"""
 
@@ -45,21 +60,22 @@ class LearningAnalyzer:
         # 4. 学习趋势
         learning_progress = student_profile.get_learning_progress()
 
-        # 5. 题型分析
-        question_type_analysis = self._analyze_question_types(
-            student_profile.data["question_type_stats"]
-        )
-
-        # 6. AI深度分析（如果可用）
-        ai_insights = None
+        # 5. AI深度分析（如果可用）：先提交到后台线程，下面的本地计算与网络请求同时进行
+        ai_future = None
         if self.client:
-            ai_insights = self._get_ai_insights(
+            ai_future = _AI_POOL.submit(
+                self._get_ai_insights,
                 overall_stats,
                 weak_points,
                 strong_points,
                 learning_progress
             )
 
+        # 6. 题型分析
+        question_type_analysis = self._analyze_question_types(
+            student_profile.data["question_type_stats"]
+        )
+
         # 7. 生成学习建议
         recommendations = self._generate_recommendations(
             weak_points,
@@ -67,6 +83,9 @@ class LearningAnalyzer:
             question_type_analysis
         )
 
+        # 等待AI分析结果（_get_ai_insights 内部已处理异常，失败时返回 None）
+        ai_insights = ai_future.result() if ai_future is not None else None
+
         return {
             "student_name": student_profile.student_name,
             "overall_stats": overall_stats,
@@ -81,33 +100,27 @@ class LearningAnalyzer:
 
     def _analyze_question_types(self, question_type_stats: Dict) -> List[Dict]:
         """分析各题型表现"""
-        analysis = []
-
-        for q_type, stats in question_type_stats.items():
-            if stats["total"] > 0:
-                analysis.append({
-                    "question_type": q_type,
-                    "total": stats["total"],
-                    "mistakes": stats["mistakes"],
-                    "accuracy_rate": stats["accuracy_rate"],
-                    "status": self._get_performance_status(stats["accuracy_rate"])
-                })
+        get_status = self._get_performance_status
+        analysis = [
+            {
+                "question_type": q_type,
+                "total": stats["total"],
+                "mistakes": stats["mistakes"],
+                "accuracy_rate": stats["accuracy_rate"],
+                "status": get_status(stats["accuracy_rate"])
+            }
+            for q_type, stats in question_type_stats.items()
+            if stats["total"] > 0
+        ]
 
         # 按正确率排序
-        analysis.sort(key=lambda x: x["accuracy_rate"])
+        analysis.sort(key=_BY_ACCURACY)
 
         return analysis
 
     def _get_performance_status(self, accuracy_rate: float) -> str:
-        """根据正确率判断掌握程度"""
-        if accuracy_rate >= 90:
-            return "优秀"
-        elif accuracy_rate >= 75:
-            return "良好"
-        elif accuracy_rate >= 60:
-            return "一般"
-        else:
-            return "需加强"
+        """根据正确率判断掌握程度（正确率 >= 90 优秀，>= 75 良好，>= 60 一般）"""
+        return _STATUS_LABELS[bisect_right(_STATUS_THRESHOLDS, accuracy_rate)]
 
     def _get_ai_insights(
         self,
@@ -3,25 +3,49 @@ OpenAI 提供者实现
 使用 OpenAI API
 """
 import json
-from typing import Dict, Any, Optional
+from functools import lru_cache
+from typing import Dict, Any, Iterator, List, Optional
 from pathlib import Path
-from openai import OpenAI
-from .ai_provider import AIProvider
+from .ai_provider import AIProvider, loads_json, new_http_client
+
+
+# JSON 模式下追加在提示词后面的格式要求
+_JSON_SUFFIX = "\n\n请以 JSON 格式返回结果。"
+
+
+@lru_cache(maxsize=None)
+def _get_client(api_key: str, base_url: Optional[str] = None):
+    """获取进程内共享的 OpenAI 客户端（按 API 密钥和服务地址各创建一次）"""
+    # 延迟导入 SDK：只生成数学题等不用 AI 的场景无需加载 openai/httpx
+    from openai import OpenAI
+
+    # 多个提供者实例共用 keep-alive 连接
+    return OpenAI(api_key=api_key, base_url=base_url, http_client=new_http_client())
 
 
 class OpenAIProvider(AIProvider):
     """OpenAI 提供者"""
 
-    def __init__(self, api_key: str, model: str = "gpt-4o"):
+    def __init__(self, api_key: str, model: str = "gpt-4o", base_url: Optional[str] = None):
         """
         初始化 OpenAI 提供者
 
         Args:
             api_key: OpenAI API 密钥
             model: OpenAI 模型名称
+            base_url: API 服务地址（可选，默认使用 OpenAI 官方地址）
         """
         super().__init__(api_key, model)
-        self.client = OpenAI(api_key=api_key)
+        self.base_url = base_url
+        self.client = _get_client(api_key, base_url)
+
+    @staticmethod
+    def _build_messages(system_prompt: Optional[str], content: Any) -> List[Dict[str, Any]]:
+        """构建消息列表（有系统提示词时放在最前面）"""
+        user_message = {"role": "user", "content": content}
+        if system_prompt:
+            return [{"role": "system", "content": system_prompt}, user_message]
+        return [user_message]
 
     def analyze_image(
         self,
@@ -40,34 +64,22 @@ class OpenAIProvider(AIProvider):
         Returns:
             AI 的文本响应
         """
-        # 编码图像
-        image_data = self.encode_image(image_path)
-        media_type = self.get_image_mime_type(image_path)
+        # 编码图像（复用按文件缓存的 base64 结果）
+        image_url = "data:%s;base64," % self.get_image_mime_type(image_path) + self.encode_image(image_path)
 
         # 构建消息
-        messages = []
-
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
-
-        messages.append({
-            "role": "user",
-            "content": [
-                {
-                    "type": "text",
-                    "text": prompt
-                },
-                {
-                    "type": "image_url",
-                    "image_url": {
-                        "url": f"data:{media_type};base64,{image_data}"
-                    }
+        messages = self._build_messages(system_prompt, [
+            {
+                "type": "text",
+                "text": prompt
+            },
+            {
+                "type": "image_url",
+                "image_url": {
+                    "url": image_url
                 }
-            ]
-        })
+            }
+        ])
 
         # 调用 API
         response = self.client.chat.completions.create(
@@ -83,7 +95,8 @@ class OpenAIProvider(AIProvider):
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 4000
+        max_tokens: int = 4000,
+        stream: bool = False
     ) -> str:
         """
         OpenAI 文本生成
@@ -93,22 +106,15 @@ class OpenAIProvider(AIProvider):
             system_prompt: 系统提示词（可选）
             temperature: 温度参数
             max_tokens: 最大 token 数
+            stream: 是否以流式方式接收响应（边生成边接收，返回值相同）
 
         Returns:
             AI 的文本响应
         """
-        messages = []
+        if stream:
+            return ''.join(self.text_completion_stream(prompt, system_prompt, temperature, max_tokens))
 
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
-
-        messages.append({
-            "role": "user",
-            "content": prompt
-        })
+        messages = self._build_messages(system_prompt, prompt)
 
         response = self.client.chat.completions.create(
             model=self.model,
@@ -119,6 +125,42 @@ class OpenAIProvider(AIProvider):
 
         return response.choices[0].message.content
 
+    def text_completion_stream(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 4000
+    ) -> Iterator[str]:
+        """
+        OpenAI 流式文本生成，逐段返回生成的文本
+
+        Args:
+            prompt: 用户提示词
+            system_prompt: 系统提示词（可选）
+            temperature: 温度参数
+            max_tokens: 最大 token 数
+
+        Yields:
+            AI 响应的文本片段
+        """
+        messages = self._build_messages(system_prompt, prompt)
+
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        for chunk in response:
+            # 结束片段可能没有 choices 或 content
+            if chunk.choices:
+                content = chunk.choices[0].delta.content
+                if content:
+                    yield content
+
     def structured_output(
         self,
         prompt: str,
@@ -136,23 +178,8 @@ class OpenAIProvider(AIProvider):
         Returns:
             结构化的 JSON 数据
         """
-        messages = []
-
-        if system_prompt:
-            messages.append({
-                "role": "system",
-                "content": system_prompt
-            })
-
         # 在提示词中说明 JSON 格式要求
-        json_prompt = f"""{prompt}
-
-请以 JSON 格式返回结果。"""
-
-        messages.append({
-            "role": "user",
-            "content": json_prompt
-        })
+        messages = self._build_messages(system_prompt, prompt + _JSON_SUFFIX)
 
         # 使用 JSON 模式
         response = self.client.chat.completions.create(
@@ -165,6 +192,6 @@ class OpenAIProvider(AIProvider):
         content = response.choices[0].message.content
 
         try:
-            return json.loads(content)
+            return loads_json(content)
         except json.JSONDecodeError as e:
             raise ValueError(f"无法解析 OpenAI 返回的 JSON: {e}\n原始响应: {content}")
@@ -2,20 +2,117 @@
 PDF生成模块
 生成专业的错题卷PDF文档
 """
+from functools import lru_cache
+from itertools import groupby
+from operator import itemgetter
 from pathlib import Path
 from typing import Dict, List, Any
 from datetime import datetime
-from reportlab.lib.pagesizes import A4
-from reportlab.lib.units import mm
-from reportlab.lib import colors
-from reportlab.platypus import (
-    SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle,
-    PageBreak, KeepTogether
+
+
+# 常见的中文字体路径（按优先级排列）
+_FONT_PATHS = (
+    # Windows
+    "C:/Windows/Fonts/simsun.ttc",
+    "C:/Windows/Fonts/simhei.ttf",
+    # Linux
+    "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
+    "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
+    # macOS
+    "/System/Library/Fonts/PingFang.ttc",
+    "/Library/Fonts/Arial Unicode.ttf",
 )
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.lib.enums import TA_CENTER, TA_LEFT, TA_JUSTIFY
+
+# 题目文本模板（题号、题目内容），原题带红色标记
+_QUESTION_TPL = "<b>%d.</b> %s"
+_ORIGINAL_QUESTION_TPL = "<b>%d.</b> %s <font color='#c62828'>[原题]</font>"
+
+# 同一段落内题目之间的分隔：换行后再空两行作为答题空间（约 10mm）
+_ANSWER_SPACE = "<br/><br/><br/>"
+
+
+@lru_cache(maxsize=1)
+def _ensure_chinese_font_registered() -> str:
+    """
+    注册中文字体（进程内只查找和解析一次字体文件）
+
+    Returns:
+        可用的字体名称，未找到中文字体时为 Helvetica
+    """
+    # 延迟导入 reportlab：不生成 PDF 的命令无需加载
+    from reportlab.pdfbase import pdfmetrics
+    from reportlab.pdfbase.ttfonts import TTFont
+
+    try:
+        for font_path in _FONT_PATHS:
+            if Path(font_path).exists():
+                try:
+                    pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
+                    print(f"成功注册字体: {font_path}")
+                    return 'ChineseFont'
+                except:
+                    continue
+
+        # 如果都失败，使用默认字体（可能不支持中文）
+        print("警告：未找到中文字体，PDF可能无法正确显示中文")
+
+    except Exception as e:
+        print(f"字体注册失败: {e}")
+
+    return 'Helvetica'
+
+
+@lru_cache(maxsize=1)
+def _build_styles(font_name: str):
+    """创建文档样式（样式构建后不再修改，可在多个文档间共用）"""
+    from reportlab.lib import colors
+    from reportlab.lib.enums import TA_CENTER, TA_LEFT
+    from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+
+    styles = getSampleStyleSheet()
+
+    # 标题样式
+    styles.add(ParagraphStyle(
+        name='ChineseTitle',
+        fontName=font_name,
+        fontSize=18,
+        leading=22,
+        alignment=TA_CENTER,
+        spaceAfter=12,
+        textColor=colors.HexColor('#333333')
+    ))
+
+    # 子标题样式
+    styles.add(ParagraphStyle(
+        name='ChineseHeading',
+        fontName=font_name,
+        fontSize=14,
+        leading=18,
+        spaceAfter=10,
+        textColor=colors.HexColor('#1a73e8')
+    ))
+
+    # 正文样式
+    styles.add(ParagraphStyle(
+        name='ChineseBody',
+        fontName=font_name,
+        fontSize=11,
+        leading=16,
+        alignment=TA_LEFT,
+        spaceAfter=8
+    ))
+
+    # 题号样式
+    styles.add(ParagraphStyle(
+        name='QuestionNumber',
+        fontName=font_name,
+        fontSize=11,
+        leading=16,
+        textColor=colors.HexColor('#c62828'),
+        spaceAfter=4
+    ))
+
+    return styles
 
 
 class PDFGenerator:
@@ -31,89 +128,15 @@ class PDFGenerator:
         self.output_dir = output_dir
         self.output_dir.mkdir(parents=True, exist_ok=True)
 
-        # 注册中文字体（使用系统字体）
-        self._register_fonts()
+        # 注册中文字体（使用系统字体，只在第一次创建时注册）
+        self.font_name = _ensure_chinese_font_registered()
 
         # 创建样式
         self.styles = self._create_styles()
 
-    def _register_fonts(self):
-        """注册中文字体"""
-        try:
-            # 尝试注册常见的中文字体路径
-            font_paths = [
-                # Windows
-                "C:/Windows/Fonts/simsun.ttc",
-                "C:/Windows/Fonts/simhei.ttf",
-                # Linux
-                "/usr/share/fonts/truetype/droid/DroidSansFallbackFull.ttf",
-                "/usr/share/fonts/opentype/noto/NotoSansCJK-Regular.ttc",
-                # macOS
-                "/System/Library/Fonts/PingFang.ttc",
-                "/Library/Fonts/Arial Unicode.ttf",
-            ]
-
-            for font_path in font_paths:
-                if Path(font_path).exists():
-                    try:
-                        pdfmetrics.registerFont(TTFont('ChineseFont', font_path))
-                        print(f"成功注册字体: {font_path}")
-                        return
-                    except:
-                        continue
-
-            # 如果都失败，使用默认字体（可能不支持中文）
-            print("警告：未找到中文字体，PDF可能无法正确显示中文")
-
-        except Exception as e:
-            print(f"字体注册失败: {e}")
-
     def _create_styles(self):
-        """创建文档样式"""
-        styles = getSampleStyleSheet()
-
-        # 标题样式
-        styles.add(ParagraphStyle(
-            name='ChineseTitle',
-            fontName='ChineseFont',
-            fontSize=18,
-            leading=22,
-            alignment=TA_CENTER,
-            spaceAfter=12,
-            textColor=colors.HexColor('#333333')
-        ))
-
-        # 子标题样式
-        styles.add(ParagraphStyle(
-            name='ChineseHeading',
-            fontName='ChineseFont',
-            fontSize=14,
-            leading=18,
-            spaceAfter=10,
-            textColor=colors.HexColor('#1a73e8')
-        ))
-
-        # 正文样式
-        styles.add(ParagraphStyle(
-            name='ChineseBody',
-            fontName='ChineseFont',
-            fontSize=11,
-            leading=16,
-            alignment=TA_LEFT,
-            spaceAfter=8
-        ))
-
-        # 题号样式
-        styles.add(ParagraphStyle(
-            name='QuestionNumber',
-            fontName='ChineseFont',
-            fontSize=11,
-            leading=16,
-            textColor=colors.HexColor('#c62828'),
-            spaceAfter=4
-        ))
-
-        return styles
+        """创建文档样式（同一字体的样式表只构建一次，各文档共用）"""
+        return _build_styles(self.font_name)
 
     def generate_mistake_paper(
         self,
@@ -132,9 +155,16 @@ class PDFGenerator:
         Returns:
             生成的PDF文件路径
         """
+        from reportlab.lib.pagesizes import A4
+        from reportlab.lib.units import mm
+        from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, PageBreak
+
+        # 文件名和说明共用同一个时间
+        now = datetime.now()
+
         # 生成文件名
         if not output_filename:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = now.strftime("%Y%m%d_%H%M%S")
             output_filename = f"错题练习_{timestamp}.pdf"
 
         output_path = self.output_dir / output_filename
@@ -162,7 +192,7 @@ class PDFGenerator:
         # 添加说明
         info_text = f"""
         <para align=center>
-        生成时间：{datetime.now().strftime("%Y年%m月%d日")} &nbsp;&nbsp;
+        生成时间：{now.strftime("%Y年%m月%d日")} &nbsp;&nbsp;
         姓名：__________ &nbsp;&nbsp;
         用时：____分钟
         </para>
@@ -186,18 +216,16 @@ class PDFGenerator:
 
             # 添加该题型下的所有题目
             for section in sections:
-                section_items = []
+                q_texts = []
 
                 # 原题（如果包含）
                 if section.get("original_question"):
                     original = section["original_question"]
-                    q_text = self._format_question(
+                    q_texts.append(self._format_question(
                         question_counter,
                         original["question_content"],
                         is_original=True
-                    )
-                    section_items.append(Paragraph(q_text, self.styles['ChineseBody']))
-                    section_items.append(Spacer(1, 10*mm))  # 答题空间
+                    ))
 
                     # 保存答案
                     if include_answers and original.get("correct_answer"):
@@ -211,12 +239,10 @@ class PDFGenerator:
 
                 # 相似题
                 for similar_q in section.get("similar_questions", []):
-                    q_text = self._format_question(
+                    q_texts.append(self._format_question(
                         question_counter,
                         similar_q["question_content"]
-                    )
-                    section_items.append(Paragraph(q_text, self.styles['ChineseBody']))
-                    section_items.append(Spacer(1, 10*mm))  # 答题空间
+                    ))
 
                     # 保存答案
                     if include_answers and similar_q.get("correct_answer"):
@@ -228,9 +254,10 @@ class PDFGenerator:
 
                     question_counter += 1
 
-                # 将该section的题目作为一组
-                if section_items:
-                    story.extend(section_items)
+                # 将该section的题目合成一个段落（题目之间空出答题空间），只解析一次标记
+                if q_texts:
+                    story.append(Paragraph(_ANSWER_SPACE.join(q_texts), self.styles['ChineseBody']))
+                    story.append(Spacer(1, 10*mm))  # 最后一题的答题空间
                     story.append(Spacer(1, 5*mm))
 
             # 每个题型后添加一些空间
@@ -242,15 +269,13 @@ class PDFGenerator:
             story.append(Paragraph("参考答案", self.styles['ChineseTitle']))
             story.append(Spacer(1, 5*mm))
 
-            current_type = None
-            for ans in all_answers:
-                if ans["type"] != current_type:
-                    current_type = ans["type"]
-                    story.append(Paragraph(f"<b>{current_type}</b>", self.styles['ChineseHeading']))
-                    story.append(Spacer(1, 2*mm))
-
-                answer_text = f"{ans['number']}. {ans['answer']}"
-                story.append(Paragraph(answer_text, self.styles['ChineseBody']))
+            # 每个题型的答案合成一个段落
+            # 答案按题目顺序收集，同一题型本来就是连续的，直接分组即可（排序会打乱题型顺序）
+            for a_type, group in groupby(all_answers, key=itemgetter("type")):
+                story.append(Paragraph(f"<b>{a_type}</b>", self.styles['ChineseHeading']))
+                story.append(Spacer(1, 2*mm))
+                body = "<br/>".join(f"{ans['number']}. {ans['answer']}" for ans in group)
+                story.append(Paragraph(body, self.styles['ChineseBody']))
 
         # 生成PDF
         doc.build(story)
@@ -278,12 +303,8 @@ class PDFGenerator:
             格式化后的HTML文本
         """
         # 如果是原题，添加标记
-        marker = " <font color='#c62828'>[原题]</font>" if is_original else ""
-
-        # 格式化题号和内容
-        formatted = f"<b>{number}.</b> {content}{marker}"
-
-        return formatted
+        template = _ORIGINAL_QUESTION_TPL if is_original else _QUESTION_TPL
+        return template % (number, content)
 
 
 if __name__ == "__main__":
@@ -3,12 +3,22 @@
 自动识别并分组试卷照片
 """
 import json
+import os
+import threading
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict, Any, Optional, Tuple
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from .ai_provider import get_ai_provider
+from .ai_provider import (
+    extract_json_text, file_digest, get_ai_provider, loads_json, read_json_file, write_json_atomic
+)
+from .config import GROUPER_WORKERS, PHOTO_META_CACHE_DIR
+
+
+# 支持的照片扩展名（小写）
+_PHOTO_SUFFIXES = frozenset({".jpg", ".jpeg", ".png", ".gif", ".webp"})
 
 
 @dataclass
@@ -44,14 +54,49 @@ class ExamGroup:
 class PhotoGrouper:
     """照片智能分组器"""
 
-    def __init__(self, ai_provider_name: Optional[str] = None):
+    # 同时进行中的 AI 请求上限（所有实例共用，避免超出提供者的速率限制）
+    _api_slots = threading.BoundedSemaphore(GROUPER_WORKERS)
+
+    def __init__(
+        self,
+        ai_provider_name: Optional[str] = None,
+        cache_dir: Optional[Path] = PHOTO_META_CACHE_DIR
+    ):
         """
         初始化照片分组器
 
         Args:
             ai_provider_name: AI 提供者名称（'claude' 或 'openai'）
+            cache_dir: 照片元数据缓存目录，为 None 时不使用磁盘缓存
         """
         self.ai_provider = get_ai_provider(ai_provider_name)
+        self.cache_dir = cache_dir
+        # 本次运行内已识别的结果（缓存键 -> 除文件名外的元数据），内容相同的照片只识别一次
+        self._memo: Dict[str, Dict[str, Any]] = {}
+
+    def _cache_key(self, image_path: Path) -> str:
+        """计算缓存键（图片内容摘要，混入提供者和模型名称）"""
+        return file_digest(image_path, f"{type(self.ai_provider).__name__}:{self.ai_provider.model}")
+
+    def _load_cached(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存的元数据（先查本次运行的结果，再查磁盘），不存在或已损坏时返回 None"""
+        cached = self._memo.get(cache_key)
+        if cached is not None or self.cache_dir is None:
+            return cached
+        cached = read_json_file(self.cache_dir / f"{cache_key}.json")
+        if cached is not None:
+            self._memo[cache_key] = cached
+        return cached
+
+    def _save_cached(self, cache_key: str, fields: Dict[str, Any]) -> None:
+        """写入元数据缓存（本次运行内和磁盘）"""
+        self._memo[cache_key] = fields
+        if self.cache_dir is None:
+            return
+        try:
+            write_json_atomic(self.cache_dir / f"{cache_key}.json", fields)
+        except OSError as e:
+            print(f"警告：写入照片元数据缓存失败: {e}")
 
     def analyze_photo(self, image_path: Path) -> PhotoMetadata:
         """
@@ -101,44 +146,42 @@ class PhotoGrouper:
 如果某个字段无法识别，请设为 null。"""
 
         try:
-            # 使用 AI 分析图像
-            result = self.ai_provider.structured_output(
-                prompt=prompt,
-                response_format={
-                    "page_type": "graded",
-                    "subject": "数学",
-                    "title": "第三单元测试卷",
-                    "exam_type": "单元测试",
-                    "chapter": "第三单元",
-                    "page_number": 1,
-                    "total_pages": 2,
-                    "date": "2025-01-15",
-                    "score": "85/100",
-                    "confidence": 0.95
-                }
-            )
-
-            # 注意：对于图像分析，需要使用 analyze_image 而不是 structured_output
-            # 先用 analyze_image 获取文本响应
-            response_text = self.ai_provider.analyze_image(
-                image_path=image_path,
-                prompt=prompt
-            )
-
-            # 尝试解析 JSON
-            # 清理可能的 markdown 代码块
-            response_text = response_text.strip()
-            if response_text.startswith("```json"):
-                response_text = response_text[7:]
-            if response_text.startswith("```"):
-                response_text = response_text[3:]
-            if response_text.endswith("```"):
-                response_text = response_text[:-3]
-            response_text = response_text.strip()
-
-            result = json.loads(response_text)
-
-            return PhotoMetadata(
+            # 内容相同的照片直接使用缓存结果，不再调用 AI
+            cache_key = self._cache_key(image_path)
+            cached = self._load_cached(cache_key)
+            if cached is not None:
+                return PhotoMetadata(filename=image_path.name, **cached)
+
+            # 限制同时进行的请求数
+            with self._api_slots:
+                # 使用 AI 分析图像
+                result = self.ai_provider.structured_output(
+                    prompt=prompt,
+                    response_format={
+                        "page_type": "graded",
+                        "subject": "数学",
+                        "title": "第三单元测试卷",
+                        "exam_type": "单元测试",
+                        "chapter": "第三单元",
+                        "page_number": 1,
+                        "total_pages": 2,
+                        "date": "2025-01-15",
+                        "score": "85/100",
+                        "confidence": 0.95
+                    }
+                )
+
+                # 注意：对于图像分析，需要使用 analyze_image 而不是 structured_output
+                # 先用 analyze_image 获取文本响应
+                response_text = self.ai_provider.analyze_image(
+                    image_path=image_path,
+                    prompt=prompt
+                )
+
+            # 尝试解析 JSON（去掉可能的 markdown 代码块）
+            result = loads_json(extract_json_text(response_text))
+
+            metadata = PhotoMetadata(
                 filename=image_path.name,
                 page_type=result.get("page_type", "unknown"),
                 subject=result.get("subject"),
@@ -152,6 +195,13 @@ class PhotoGrouper:
                 confidence=result.get("confidence", 0.0)
             )
 
+            # 缓存除文件名外的字段（同样内容的照片可能使用不同文件名）
+            fields = asdict(metadata)
+            del fields["filename"]
+            self._save_cached(cache_key, fields)
+
+            return metadata
+
         except Exception as e:
             print(f"警告：分析照片 {image_path.name} 时出错: {e}")
             # 返回未知类型
@@ -164,7 +214,8 @@ class PhotoGrouper:
     def group_photos(
         self,
         photo_dir: Path,
-        photo_metadata_list: Optional[List[PhotoMetadata]] = None
+        photo_metadata_list: Optional[List[PhotoMetadata]] = None,
+        max_workers: int = GROUPER_WORKERS
     ) -> List[ExamGroup]:
         """
         将照片分组为考试
@@ -172,20 +223,27 @@ class PhotoGrouper:
         Args:
             photo_dir: 照片目录
             photo_metadata_list: 照片元数据列表（如果已分析）
+            max_workers: 并发分析照片的线程数，为 1 时逐张顺序分析
 
         Returns:
             考试分组列表
         """
         # 如果没有提供元数据，先分析所有照片
         if photo_metadata_list is None:
-            image_files = sorted(
-                [f for f in photo_dir.iterdir()
-                 if f.suffix.lower() in ['.jpg', '.jpeg', '.png', '.gif', '.webp']],
-                key=lambda x: x.name
-            )
-            photo_metadata_list = [
-                self.analyze_photo(img) for img in image_files
-            ]
+            # 单次扫描目录，只按文件名判断扩展名，不逐个 stat 文件
+            with os.scandir(photo_dir) as entries:
+                image_files = [
+                    Path(entry.path) for entry in sorted(
+                        (entry for entry in entries
+                         if os.path.splitext(entry.name)[1].lower() in _PHOTO_SUFFIXES),
+                        key=lambda entry: entry.name
+                    )
+                ]
+            # 多张照片并发分析，读取和哈希图片也在各工作线程中进行
+            # （executor.map 按输入顺序返回，后面的分组依赖这个顺序）
+            workers = max(1, min(max_workers, len(image_files)))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                photo_metadata_list = list(executor.map(self.analyze_photo, image_files))
 
         # 分组策略
         groups: List[ExamGroup] = []
@@ -4,9 +4,22 @@
 """
 import json
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Iterator, List, Dict, Any, Optional
 from datetime import datetime
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
+from .ai_provider import dumps_json, write_atomic
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时一次性读入整个快照
+    ijson = None
+
+
+# 追加日志行数超过快照题目数且不少于该值时，保存时合并成新的快照
+_COMPACT_MIN_JOURNAL_LINES = 500
+
+# 快照代数在元数据和日志首行中的键名
+_JOURNAL_HEADER_KEY = 'journal_generation'
 
 
 class Question(BaseModel):
@@ -23,11 +36,20 @@ class Question(BaseModel):
     source_image: Optional[str] = Field(default=None, description="来源图片")
     created_at: str = Field(default_factory=lambda: datetime.now().isoformat(), description="创建时间")
 
+    # 创建（或上次保存）之后是否修改过字段，题库保存时据此决定是否重写快照
+    _modified: bool = PrivateAttr(default=False)
+
     def __init__(self, **data):
         super().__init__(**data)
         if not self.id:
             # 生成唯一ID：时间戳 + 题号
             self.id = f"{datetime.now().strftime('%Y%m%d%H%M%S')}_{self.question_number.replace(' ', '_')}"
+        self._modified = False
+
+    def __setattr__(self, name, value):
+        super().__setattr__(name, value)
+        if name in type(self).model_fields:
+            self._modified = True
 
 
 class QuestionBank:
@@ -37,10 +59,17 @@ class QuestionBank:
         """
         初始化题库
 
+        题库由三个文件组成：
+        - db_path：完整快照（原有的 JSON 格式，可直接查看和编辑）
+        - 同名 .jsonl：快照之后新增的题目，每行一道，只追加不改写（首行记录所属的快照代数）
+        - 同名 .meta.json：最新的元数据
+
         Args:
             db_path: 题库JSON文件路径
         """
         self.db_path = db_path
+        self.journal_path = db_path.with_name(db_path.stem + ".jsonl")
+        self.meta_path = db_path.with_name(db_path.stem + ".meta.json")
         self.questions: List[Question] = []
         self.metadata: Dict[str, Any] = {
             "total_count": 0,
@@ -48,71 +77,281 @@ class QuestionBank:
             "last_updated": None,
             "question_types": {}
         }
+        # 按类型和是否错题建立的索引，随增删题目同步更新（只保存引用，不复制题目）
+        # 查询和统计时无需重新遍历全部题目
+        self._by_type: Dict[str, List[Question]] = {}
+        self._mistakes: List[Question] = []
+        self._mistakes_by_type: Dict[str, List[Question]] = {}
+        # 已写入磁盘的题目（快照中的 + 追加日志中的，按顺序），之后新增的题目保存时追加
+        self._persisted: List[Question] = []
+        # 通过 update_question / remove_question / mark_dirty 修改过题库，下次保存时重写快照
+        self._dirty = False
+        self._journal_lines = 0
+        self._journal_damaged = False
+        # 快照的代数：每次重写快照加一，追加日志和元数据文件记录自己所属的代数，
+        # 重写快照后、删除旧日志前中断时，旧日志因代数不符被跳过，不会重复加载
+        self._generation = 0
         self.load()
 
     def load(self):
-        """从文件加载题库"""
-        if self.db_path.exists():
-            try:
-                with open(self.db_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
-                    self.questions = [Question(**q) for q in data.get('questions', [])]
-                    self.metadata = data.get('metadata', self.metadata)
-                print(f"题库加载成功：{len(self.questions)} 道题目")
-            except Exception as e:
-                print(f"题库加载失败: {e}")
-                self.questions = []
-        else:
+        """从文件加载题库（快照 + 追加日志）"""
+        if not self.db_path.exists() and not self.journal_path.exists():
             print("题库文件不存在，将创建新题库")
+            return
+
+        try:
+            if self.db_path.exists():
+                self._load_snapshot()
+            self._generation = self.metadata.get(_JOURNAL_HEADER_KEY, 0)
+
+            self._journal_lines = 0
+            if self.journal_path.exists():
+                with open(self.journal_path, 'r', encoding='utf-8') as f:
+                    self._load_journal(f)
+
+            if self.meta_path.exists():
+                with open(self.meta_path, 'r', encoding='utf-8') as f:
+                    metadata = json.load(f)
+                # 旧代数的元数据已被快照取代
+                if metadata.get(_JOURNAL_HEADER_KEY, 0) == self._generation:
+                    self.metadata = metadata
+            print(f"题库加载成功：{len(self.questions)} 道题目")
+        except Exception as e:
+            print(f"题库加载失败: {e}")
+            self.questions = []
+        self._reindex()
+        self._persisted = list(self.questions)
+
+    def _load_journal(self, f):
+        """读取追加日志中的题目（第一行记录日志所属的快照代数）"""
+        first = True
+        for line in f:
+            if not line.strip():
+                continue
+            if first:
+                first = False
+                generation = self._journal_header(line)
+                if generation is not None:
+                    if generation != self._generation and self.db_path.exists():
+                        # 这份日志已合并进快照（重写快照后未来得及删除），整份跳过，下次保存时删除
+                        print("警告：跳过已合并进快照的题库追加日志")
+                        self._journal_damaged = True
+                        return
+                    continue
+            try:
+                self.questions.append(Question.model_validate_json(line))
+            except ValueError:
+                # 写入中途退出会留下不完整的最后一行，跳过即可（下次保存时重写快照）
+                print("警告：跳过题库追加日志中无法解析的一行")
+                self._journal_damaged = True
+                continue
+            self._journal_lines += 1
+
+    @staticmethod
+    def _journal_header(line: str) -> Optional[int]:
+        """解析日志首行记录的快照代数，不是头部行时返回 None"""
+        try:
+            header = json.loads(line)
+        except ValueError:
+            return None
+        if isinstance(header, dict):
+            return header.get(_JOURNAL_HEADER_KEY)
+        return None
+
+    def _load_snapshot(self):
+        """读取快照中的题目和元数据"""
+        if ijson is None:
+            with open(self.db_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+                self.questions = [Question(**q) for q in data.get('questions', [])]
+                self.metadata = data.get('metadata', self.metadata)
+            return
+
+        # 流式解析：每道题目解析完立即构建 Question，不在内存中保留整个文档
+        with open(self.db_path, 'rb') as f:
+            # 元数据在文件开头，读到它就停止
+            self.metadata = next(ijson.items(f, 'metadata', use_float=True), self.metadata)
+            f.seek(0)
+            self.questions = [
+                Question(**q) for q in ijson.items(f, 'questions.item', use_float=True)
+            ]
 
     def save(self):
-        """保存题库到文件"""
+        """
+        保存题库到文件
+
+        只新增了题目时，把新增的题目追加到日志文件；题目被修改、删除或替换，
+        快照不存在、日志有损坏，或日志已经比快照还长时，改为重写完整快照。
+        """
+        persisted = self._persisted
+        n_persisted = len(persisted)
+        rewritten = (
+            self._dirty
+            or len(self.questions) < n_persisted
+            or any(q is not p or q._modified for q, p in zip(self.questions, persisted))
+        )
+        if rewritten:
+            # 题目被直接修改过，索引可能已过期
+            self._reindex()
+
         # 更新元数据
         self.metadata['total_count'] = len(self.questions)
-        self.metadata['mistake_count'] = sum(1 for q in self.questions if q.is_mistake)
+        self.metadata['mistake_count'] = len(self._mistakes)
         self.metadata['last_updated'] = datetime.now().isoformat()
+        self.metadata[_JOURNAL_HEADER_KEY] = self._generation
 
-        # 统计各类型题目数量
-        type_counts = {}
-        for q in self.questions:
-            type_counts[q.question_type] = type_counts.get(q.question_type, 0) + 1
-        self.metadata['question_types'] = type_counts
-
-        # 保存到文件
-        data = {
-            'metadata': self.metadata,
-            'questions': [q.model_dump() for q in self.questions]
+        # 各类型题目数量
+        self.metadata['question_types'] = {
+            q_type: len(questions) for q_type, questions in self._by_type.items()
         }
 
         self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        with open(self.db_path, 'w', encoding='utf-8') as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
+
+        pending = self.questions[n_persisted:]
+        journal_lines = self._journal_lines + len(pending)
+        if (rewritten
+                or self._journal_damaged
+                or not self.db_path.exists()
+                or journal_lines > max(_COMPACT_MIN_JOURNAL_LINES, len(self.questions) - journal_lines)):
+            self.compact()
+        else:
+            if pending:
+                header = '' if self.journal_path.exists() else (
+                    json.dumps({_JOURNAL_HEADER_KEY: self._generation}) + '\n'
+                )
+                with open(self.journal_path, 'a', encoding='utf-8') as f:
+                    f.write(header + ''.join(q.model_dump_json() + '\n' for q in pending))
+                self._journal_lines = journal_lines
+                persisted.extend(pending)
+            write_atomic(self.meta_path, (dumps_json(self.metadata),))
 
         print(f"题库已保存：{len(self.questions)} 道题目")
 
+    def compact(self):
+        """把全部题目重写为一个完整快照，并清空追加日志"""
+        generation = self._generation + 1
+        self.metadata[_JOURNAL_HEADER_KEY] = generation
+        write_atomic(self.db_path, self._iter_snapshot())
+        self._generation = generation
+
+        # 快照已包含全部题目和元数据，日志和元数据文件不再需要
+        for path in (self.journal_path, self.meta_path):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+        self._journal_lines = 0
+        self._journal_damaged = False
+        self._dirty = False
+        for q in self.questions:
+            q._modified = False
+        self._persisted = list(self.questions)
+
+    def _iter_snapshot(self) -> Iterator[str]:
+        """
+        逐段生成快照的 JSON 文本（与 json.dump(indent=2, ensure_ascii=False) 的输出一致）
+
+        每道题目由 pydantic 直接序列化为 JSON，不经过中间的字典，
+        再把缩进整体右移到 questions 数组内的层级。
+        """
+        yield '{\n  "metadata": '
+        yield dumps_json(self.metadata).replace('\n', '\n  ')
+        if not self.questions:
+            yield ',\n  "questions": []\n}'
+            return
+
+        yield ',\n  "questions": ['
+        separator = '\n    '
+        for q in self.questions:
+            yield separator
+            yield q.model_dump_json(indent=2).replace('\n', '\n    ')
+            separator = ',\n    '
+        yield '\n  ]\n}'
+
+    def _reindex(self):
+        """遍历一次全部题目，重建按类型和错题的索引"""
+        self._by_type = {}
+        self._mistakes = []
+        self._mistakes_by_type = {}
+        for q in self.questions:
+            self._index(q)
+
+    def _index(self, question: Question):
+        """把一道题目加入索引"""
+        q_type = question.question_type
+        self._by_type.setdefault(q_type, []).append(question)
+        if question.is_mistake:
+            self._mistakes.append(question)
+            self._mistakes_by_type.setdefault(q_type, []).append(question)
+
     def add_question(self, question: Question):
         """添加题目"""
         self.questions.append(question)
+        self._index(question)
 
     def add_questions(self, questions: List[Question]):
         """批量添加题目"""
         self.questions.extend(questions)
+        for q in questions:
+            self._index(q)
+
+    def update_question(self, question: Question):
+        """
+        替换ID相同的题目（找不到时添加为新题目）
+
+        Args:
+            question: 修改后的题目
+        """
+        for i, q in enumerate(self.questions):
+            if q.id == question.id:
+                self.questions[i] = question
+                self.mark_dirty()
+                return
+        self.add_question(question)
+
+    def remove_question(self, question_id: str) -> bool:
+        """
+        删除指定ID的题目
+
+        Returns:
+            是否找到并删除了题目
+        """
+        remaining = [q for q in self.questions if q.id != question_id]
+        if len(remaining) == len(self.questions):
+            return False
+        self.questions = remaining
+        self.mark_dirty()
+        return True
+
+    def mark_dirty(self):
+        """
+        标记题库已被修改（直接修改题目列表或题目内容后调用）
+
+        重建查询索引，下次保存时重写完整快照。
+        """
+        self._dirty = True
+        self._reindex()
 
     def get_all_questions(self) -> List[Question]:
-        """获取所有题目"""
+        """
+        获取所有题目
+
+        返回的是题库内部的列表。直接给题目字段赋值会在保存时自动写入；
+        其他修改（增删列表元素、修改知识点列表等）之后请调用 mark_dirty。
+        """
         return self.questions
 
     def get_mistakes(self) -> List[Question]:
-        """获取所有错题"""
-        return [q for q in self.questions if q.is_mistake]
+        """获取所有错题（返回新列表，调用方可以随意修改）"""
+        return list(self._mistakes)
 
     def get_by_type(self, question_type: str) -> List[Question]:
         """根据类型获取题目"""
-        return [q for q in self.questions if q.question_type == question_type]
+        return list(self._by_type.get(question_type, ()))
 
     def get_mistakes_by_type(self, question_type: str) -> List[Question]:
         """根据类型获取错题"""
-        return [q for q in self.questions if q.is_mistake and q.question_type == question_type]
+        return list(self._mistakes_by_type.get(question_type, ()))
 
     def import_from_analysis_results(self, analysis_results: List[Dict[str, Any]]):
         """
@@ -154,20 +393,72 @@ class QuestionBank:
         print(f"最后更新: {self.metadata['last_updated']}")
         print("\n各类型题目统计:")
         for q_type, count in self.metadata['question_types'].items():
-            mistakes = len(self.get_mistakes_by_type(q_type))
+            mistakes = len(self._mistakes_by_type.get(q_type, ()))
             print(f"  {q_type}: {count} 道 (错题: {mistakes})")
         print("=" * 60)
 
     def clear(self):
         """清空题库"""
         self.questions = []
+        self.mark_dirty()
         self.save()
         print("题库已清空")
 
 
+def _roundtrip_check():
+    """
+    在临时目录中检查 追加 → 重新加载 → 重写快照 → 重新加载 的往返结果，
+    包括重写快照后、删除旧日志前中断的情况（旧日志不能被重复加载）
+    """
+    import shutil
+    import tempfile
+
+    tmp_dir = Path(tempfile.mkdtemp())
+    try:
+        db_path = tmp_dir / "questions.json"
+        bank = QuestionBank(db_path)
+        bank.add_questions([
+            Question(id=f"q{i}", question_number=str(i), question_type="计算题", question_content=f"{i}+1")
+            for i in range(3)
+        ])
+        bank.save()
+        bank.add_question(Question(id="q3", question_number="3", question_type="应用题", question_content="3+1"))
+        bank.save()
+        assert bank.journal_path.exists()
+
+        # 追加 → 重新加载
+        bank = QuestionBank(db_path)
+        assert [q.id for q in bank.questions] == ["q0", "q1", "q2", "q3"]
+
+        # 模拟重写快照后、删除日志前中断：保留旧日志和元数据文件
+        stale_journal = bank.journal_path.read_bytes()
+        stale_meta = bank.meta_path.read_bytes()
+        bank.compact()
+        bank.journal_path.write_bytes(stale_journal)
+        bank.meta_path.write_bytes(stale_meta)
+
+        # 重写快照 → 重新加载：旧日志被跳过，题目不重复
+        bank = QuestionBank(db_path)
+        assert [q.id for q in bank.questions] == ["q0", "q1", "q2", "q3"]
+        assert bank.metadata['total_count'] == 4
+
+        # 下次保存时删除旧日志，之后的追加照常进行
+        bank.add_question(Question(id="q4", question_number="4", question_type="计算题", question_content="4+1"))
+        bank.save()
+        bank.add_question(Question(id="q5", question_number="5", question_type="计算题", question_content="5+1"))
+        bank.save()
+        bank = QuestionBank(db_path)
+        assert [q.id for q in bank.questions] == ["q0", "q1", "q2", "q3", "q4", "q5"]
+        print("题库往返检查通过")
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
 if __name__ == "__main__":
     # 测试代码
     from .config import QUESTION_BANK_PATH
 
+    _roundtrip_check()
+
     bank = QuestionBank(QUESTION_BANK_PATH)
     bank.print_statistics()
@@ -2,27 +2,109 @@
 相似题生成模块
 使用 Claude API 基于错题生成相似的练习题
 """
-import json
-from typing import List, Dict, Any
+import hashlib
+import time
+from pathlib import Path
+from typing import List, Dict, Any, Optional
 from anthropic import Anthropic
+from .ai_provider import extract_json_text, loads_json, read_json_file, write_json_atomic
 from .config import ANTHROPIC_API_KEY, CLAUDE_MODEL, SIMILAR_QUESTIONS_COUNT
 from .question_bank import Question
 
 
+# 生成相似题时每次请求的最大输出 token 数
+_MAX_TOKENS = 2048
+
+# 查询批处理任务状态的间隔（秒）
+_BATCH_POLL_INTERVAL = 10
+
+# 等待批处理任务完成的最长时间（秒），超时后取消任务并改为逐题生成
+_BATCH_MAX_WAIT = 30 * 60
+
+# 生成相似题的固定说明（角色、要求、输出格式），每道错题都相同
+_SYSTEM_PROMPT = """你是一位经验丰富的小学三年级数学老师。用户会给出一道学生做错的题目，请生成相似的练习题。
+
+要求：
+1. 生成的题目应该与原题在知识点、难度上相似
+2. 但题目内容要有所变化（比如换数字、换场景、换问法等）
+3. 每道题目都要确保数学正确性
+4. 如果原题是应用题，生成的题目也应该是应用题，但场景可以不同
+5. 如果原题是计算题，生成的题目也应该是计算题，但数字要不同
+6. 题目难度要适合三年级学生
+
+请以JSON格式返回结果，格式如下：
+{
+    "similar_questions": [
+        {
+            "question_content": "题目内容（完整的题目文本）",
+            "correct_answer": "正确答案",
+            "solution": "解题步骤说明（简要）",
+            "knowledge_points": ["知识点1", "知识点2"]
+        },
+        ...
+    ]
+}
+
+注意：
+- 生成用户要求数量的题目
+- 每道题都必须有明确的正确答案
+- 请确保返回的是有效的JSON格式
+- 数学公式用文本形式表示（如：3×5=15）"""
+
+# 每道错题的提示词模板（题目数量、题目类型、题目内容、知识点、学生答案、正确答案、错误原因、题目数量）
+_PROMPT_TPL = """请基于以下错题，生成 %d 道相似的练习题。
+
+原题信息：
+- 题目类型：%s
+- 题目内容：%s
+- 知识点：%s
+- 学生答案：%s
+- 正确答案：%s
+- 错误原因：%s
+
+请确保生成 %d 道题目。"""
+
+
 class QuestionGenerator:
     """相似题生成器"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, cache_dir: Optional[Path] = None):
         """
         初始化生成器
 
         Args:
             api_key: Anthropic API密钥，如果不提供则从配置中读取
+            cache_dir: 相似题缓存目录，为 None 时不缓存（每次运行都生成新的题目）
         """
         self.api_key = api_key or ANTHROPIC_API_KEY
         if not self.api_key:
             raise ValueError("未找到 ANTHROPIC_API_KEY，请在 .env 文件中配置")
         self.client = Anthropic(api_key=self.api_key)
+        self.cache_dir = cache_dir
+
+    @staticmethod
+    def _cache_key(prompt: str) -> str:
+        """计算缓存键（模型名称、系统提示词和提示词的 BLAKE2b 摘要）"""
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (CLAUDE_MODEL, _SYSTEM_PROMPT, prompt):
+            digest.update(part.encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def _load_cached(self, prompt: str) -> Optional[List[Dict[str, Any]]]:
+        """读取缓存的相似题，未启用缓存、不存在或已损坏时返回 None"""
+        if self.cache_dir is None:
+            return None
+        return read_json_file(self.cache_dir / f"{self._cache_key(prompt)}.json")
+
+    def _save_cached(self, prompt: str, similar_questions: List[Dict[str, Any]]) -> None:
+        """写入相似题缓存，生成失败的空结果不缓存"""
+        if self.cache_dir is None or not similar_questions:
+            return
+        try:
+            write_json_atomic(self.cache_dir / f"{self._cache_key(prompt)}.json", similar_questions)
+        except OSError as e:
+            print(f"  警告: 写入缓存失败: {e}")
 
     def generate_similar_questions(
         self,
@@ -41,49 +123,19 @@ class QuestionGenerator:
         """
         print(f"正在为题目「{original_question.question_number}」生成 {count} 道相似题...")
 
-        # 构建提示词
-        prompt = f"""你是一位经验丰富的小学三年级数学老师。请基于以下错题，生成 {count} 道相似的练习题。
-
-原题信息：
-- 题目类型：{original_question.question_type}
-- 题目内容：{original_question.question_content}
-- 知识点：{', '.join(original_question.knowledge_points) if original_question.knowledge_points else '未指定'}
-- 学生答案：{original_question.student_answer or '未作答'}
-- 正确答案：{original_question.correct_answer or '未知'}
-- 错误原因：{original_question.mistake_type or '未分析'}
+        prompt = self._build_prompt(original_question, count)
 
-要求：
-1. 生成的题目应该与原题在知识点、难度上相似
-2. 但题目内容要有所变化（比如换数字、换场景、换问法等）
-3. 每道题目都要确保数学正确性
-4. 如果原题是应用题，生成的题目也应该是应用题，但场景可以不同
-5. 如果原题是计算题，生成的题目也应该是计算题，但数字要不同
-6. 题目难度要适合三年级学生
-
-请以JSON格式返回结果，格式如下：
-{{
-    "similar_questions": [
-        {{
-            "question_content": "题目内容（完整的题目文本）",
-            "correct_answer": "正确答案",
-            "solution": "解题步骤说明（简要）",
-            "knowledge_points": ["知识点1", "知识点2"]
-        }},
-        ...
-    ]
-}}
-
-注意：
-- 请确保生成 {count} 道题目
-- 每道题都必须有明确的正确答案
-- 请确保返回的是有效的JSON格式
-- 数学公式用文本形式表示（如：3×5=15）"""
+        cached = self._load_cached(prompt)
+        if cached is not None:
+            print(f"  使用缓存的 {len(cached)} 道相似题")
+            return cached
 
         try:
             # 调用Claude API
             message = self.client.messages.create(
                 model=CLAUDE_MODEL,
-                max_tokens=2048,
+                max_tokens=_MAX_TOKENS,
+                system=_SYSTEM_PROMPT,
                 messages=[
                     {
                         "role": "user",
@@ -93,21 +145,8 @@ class QuestionGenerator:
             )
 
             # 解析响应
-            response_text = message.content[0].text.strip()
-
-            # 提取JSON部分
-            if "```json" in response_text:
-                start = response_text.find("```json") + 7
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-            elif "```" in response_text:
-                start = response_text.find("```") + 3
-                end = response_text.find("```", start)
-                response_text = response_text[start:end].strip()
-
-            # 解析JSON
-            result = json.loads(response_text)
-            similar_questions = result.get('similar_questions', [])
+            similar_questions = self._parse_response(message.content[0].text)
+            self._save_cached(prompt, similar_questions)
 
             print(f"  成功生成 {len(similar_questions)} 道相似题")
             return similar_questions
@@ -116,10 +155,33 @@ class QuestionGenerator:
             print(f"  生成失败: {str(e)}")
             return []
 
+    @staticmethod
+    def _build_prompt(original_question: Question, count: int) -> str:
+        """构建生成相似题的提示词（只含这道错题的信息，固定说明在系统提示词中）"""
+        knowledge_points = original_question.knowledge_points
+        return _PROMPT_TPL % (
+            count,
+            original_question.question_type,
+            original_question.question_content,
+            ', '.join(knowledge_points) if knowledge_points else '未指定',
+            original_question.student_answer or '未作答',
+            original_question.correct_answer or '未知',
+            original_question.mistake_type or '未分析',
+            count,
+        )
+
+    @staticmethod
+    def _parse_response(response_text: str) -> List[Dict[str, Any]]:
+        """从模型响应中提取相似题列表（JSON 可能包在 markdown 代码块里）"""
+        # 提取JSON部分并解析
+        result = loads_json(extract_json_text(response_text))
+        return result.get('similar_questions', [])
+
     def generate_for_mistakes(
         self,
         mistakes: List[Question],
-        count_per_question: int = SIMILAR_QUESTIONS_COUNT
+        count_per_question: int = SIMILAR_QUESTIONS_COUNT,
+        use_batch: bool = False
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         为多道错题批量生成相似题
@@ -127,30 +189,153 @@ class QuestionGenerator:
         Args:
             mistakes: 错题列表
             count_per_question: 每道错题生成的相似题数量
+            use_batch: 是否使用 Message Batches API（费用减半，但可能要排队等待较长时间）
 
         Returns:
             字典，键为原题ID，值为相似题列表
         """
+        generated = self._generate_all(mistakes, count_per_question, use_batch)
+        return {mistake.id: similar for mistake, similar in zip(mistakes, generated)}
+
+    def _generate_all(
+        self,
+        mistakes: List[Question],
+        count_per_question: int,
+        use_batch: bool
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        为多道错题生成相似题，返回与 mistakes 一一对应的相似题列表
+
+        提示词完全相同的错题（题目、答案、错误原因都一样）只生成一次，结果共用。
+        结果按位置对应而不是按题目ID，同一秒导入的同题号题目ID可能相同。
+        """
         print(f"\n开始为 {len(mistakes)} 道错题生成相似题...")
         print("=" * 60)
 
-        results = {}
-        for idx, mistake in enumerate(mistakes, 1):
-            print(f"\n[{idx}/{len(mistakes)}] ", end="")
-            similar_questions = self.generate_similar_questions(mistake, count_per_question)
-            results[mistake.id] = similar_questions
+        prompt_slots: Dict[str, int] = {}  # 提示词 -> 在 unique_mistakes 中的位置
+        slots = []
+        unique_mistakes = []
+        for mistake in mistakes:
+            prompt = self._build_prompt(mistake, count_per_question)
+            slot = prompt_slots.get(prompt)
+            if slot is None:
+                slot = prompt_slots[prompt] = len(unique_mistakes)
+                unique_mistakes.append(mistake)
+            slots.append(slot)
+        if len(unique_mistakes) < len(mistakes):
+            print(f"其中 {len(mistakes) - len(unique_mistakes)} 道错题与前面的重复，直接复用生成结果")
+
+        generated = None
+        if use_batch and len(unique_mistakes) > 1:
+            try:
+                generated = self._generate_batch(unique_mistakes, count_per_question)
+            except Exception as e:
+                print(f"批处理失败，改为逐题生成: {e}")
+
+        if generated is None:
+            generated = []
+            for idx, mistake in enumerate(unique_mistakes, 1):
+                print(f"\n[{idx}/{len(unique_mistakes)}] ", end="")
+                generated.append(self.generate_similar_questions(mistake, count_per_question))
+
+        results = [generated[slot] for slot in slots]
 
         print("\n" + "=" * 60)
-        total_generated = sum(len(v) for v in results.values())
+        total_generated = sum(len(v) for v in results)
         print(f"生成完成！共生成 {total_generated} 道相似题")
 
         return results
 
+    def generate_for_mistakes_batch(
+        self,
+        mistakes: List[Question],
+        count_per_question: int = SIMILAR_QUESTIONS_COUNT
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        通过 Message Batches API 一次提交所有错题的生成请求
+
+        Args:
+            mistakes: 错题列表
+            count_per_question: 每道错题生成的相似题数量
+
+        Returns:
+            字典，键为原题ID，值为相似题列表（失败的题目为空列表）
+
+        Raises:
+            TimeoutError: 超过 _BATCH_MAX_WAIT 秒仍未完成（任务已取消）
+        """
+        generated = self._generate_batch(mistakes, count_per_question)
+        return {mistake.id: similar for mistake, similar in zip(mistakes, generated)}
+
+    def _generate_batch(
+        self,
+        mistakes: List[Question],
+        count_per_question: int
+    ) -> List[List[Dict[str, Any]]]:
+        """通过 Message Batches API 生成，返回与 mistakes 一一对应的相似题列表"""
+        prompts = [self._build_prompt(mistake, count_per_question) for mistake in mistakes]
+
+        # 已缓存的题目不再提交
+        results = []
+        requests = []
+        for idx, prompt in enumerate(prompts):
+            cached = self._load_cached(prompt)
+            results.append(cached if cached is not None else [])
+            if cached is not None:
+                continue
+
+            # custom_id 只允许字母、数字、下划线和连字符，题目ID可能含中文，这里用序号
+            requests.append({
+                "custom_id": f"q{idx}",
+                "params": {
+                    "model": CLAUDE_MODEL,
+                    "max_tokens": _MAX_TOKENS,
+                    "system": _SYSTEM_PROMPT,
+                    "messages": [
+                        {
+                            "role": "user",
+                            "content": prompt
+                        }
+                    ],
+                },
+            })
+
+        if not requests:
+            print("所有错题都已有缓存的相似题")
+            return results
+
+        batch = self.client.messages.batches.create(requests=requests)
+        print(f"已提交批处理任务 {batch.id}（{len(requests)} 个请求），等待完成...")
+
+        deadline = time.monotonic() + _BATCH_MAX_WAIT
+        while batch.processing_status != "ended":
+            if time.monotonic() >= deadline:
+                self.client.messages.batches.cancel(batch.id)
+                raise TimeoutError(f"批处理任务 {batch.id} 超过 {_BATCH_MAX_WAIT} 秒未完成，已取消")
+            time.sleep(_BATCH_POLL_INTERVAL)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        for entry in self.client.messages.batches.results(batch.id):
+            idx = int(entry.custom_id[1:])
+            mistake = mistakes[idx]
+            if entry.result.type != "succeeded":
+                print(f"  题目「{mistake.question_number}」生成失败: {entry.result.type}")
+                continue
+            try:
+                similar_questions = self._parse_response(entry.result.message.content[0].text)
+                results[idx] = similar_questions
+                self._save_cached(prompts[idx], similar_questions)
+            except Exception as e:
+                print(f"  题目「{mistake.question_number}」解析失败: {str(e)}")
+
+        return results
+
     def generate_practice_set(
         self,
         mistakes: List[Question],
         include_original: bool = True,
-        similar_count: int = SIMILAR_QUESTIONS_COUNT
+        similar_count: int = SIMILAR_QUESTIONS_COUNT,
+        use_batch: bool = False
     ) -> Dict[str, List[Dict[str, Any]]]:
         """
         生成练习题集（原题+相似题，按题型分类）
@@ -159,47 +344,35 @@ class QuestionGenerator:
             mistakes: 错题列表
             include_original: 是否包含原题
             similar_count: 每道错题生成的相似题数量
+            use_batch: 是否使用 Message Batches API 生成相似题
 
         Returns:
             按题型分类的练习题集
         """
         print("\n生成练习题集...")
 
-        # 按题型分组
-        mistakes_by_type = {}
-        for mistake in mistakes:
-            q_type = mistake.question_type
-            if q_type not in mistakes_by_type:
-                mistakes_by_type[q_type] = []
-            mistakes_by_type[q_type].append(mistake)
+        # 一次为所有错题生成相似题（重复的错题只请求一次）
+        similar_lists = self._generate_all(mistakes, similar_count, use_batch)
 
-        # 为每个题型生成练习题
+        # 按题型分组
         practice_set = {}
-        for q_type, type_mistakes in mistakes_by_type.items():
-            print(f"\n处理题型：{q_type} ({len(type_mistakes)} 道错题)")
-            practice_set[q_type] = []
-
-            for mistake in type_mistakes:
-                section = {
-                    "original_question": None,
-                    "similar_questions": []
+        for mistake, similar_questions in zip(mistakes, similar_lists):
+            section = {
+                "original_question": None,
+                "similar_questions": similar_questions
+            }
+
+            # 添加原题
+            if include_original:
+                section["original_question"] = {
+                    "question_number": mistake.question_number,
+                    "question_content": mistake.question_content,
+                    "student_answer": mistake.student_answer,
+                    "correct_answer": mistake.correct_answer,
+                    "is_original": True
                 }
 
-                # 添加原题
-                if include_original:
-                    section["original_question"] = {
-                        "question_number": mistake.question_number,
-                        "question_content": mistake.question_content,
-                        "student_answer": mistake.student_answer,
-                        "correct_answer": mistake.correct_answer,
-                        "is_original": True
-                    }
-
-                # 生成相似题
-                similar_questions = self.generate_similar_questions(mistake, similar_count)
-                section["similar_questions"] = similar_questions
-
-                practice_set[q_type].append(section)
+            practice_set.setdefault(mistake.question_type, []).append(section)
 
         return practice_set
 
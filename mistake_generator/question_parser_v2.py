@@ -8,7 +8,7 @@ from pathlib import Path
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass, field, asdict
 from datetime import datetime
-from .ai_provider import get_ai_provider
+from .ai_provider import extract_json_text, get_ai_provider
 
 
 @dataclass
@@ -340,14 +340,7 @@ class QuestionParserV2:
 
     def _clean_json_response(self, text: str) -> str:
         """清理 AI 返回的 JSON 响应"""
-        text = text.strip()
-        if text.startswith("```json"):
-            text = text[7:]
-        if text.startswith("```"):
-            text = text[3:]
-        if text.endswith("```"):
-            text = text[:-3]
-        return text.strip()
+        return extract_json_text(text)
 
     def save_questions(self, questions: List[QuestionV2], output_file: Path) -> None:
         """保存题目数据"""